@@ -13,6 +13,14 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import matplotlib.pyplot as plt
+import sys
+
+# Batch periodogram engine lives with the other pipeline scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+from kepler_lightcurves import STORE_DIR
+
+LIGHTCURVE_STORE = Path(STORE_DIR)
+N_NULL_SIMULATIONS = 10_000   # Quick check; period_excess_null.py runs the full 1M
 
 def calculate_k(f_puls, f_orb):
     """
@@ -36,15 +44,19 @@ def calculate_k(f_puls, f_orb):
 
 def load_kirk_catalog(file_path):
     """Load Kirk+2016 heartbeat star catalog"""
-    # Read catalog (skip header)
-    df = pd.read_csv(file_path, sep='|', skiprows=4, skipinitialspace=True)
+    # Read catalog (header on line 3, rules on lines 2 and 4)
+    df = pd.read_csv(file_path, sep='|', skiprows=[0, 1, 3], skipinitialspace=True)
 
     # Clean column names
     df.columns = df.columns.str.strip()
+    df['KIC'] = pd.to_numeric(df['KIC'], errors='coerce').astype('Int64')
 
     # Convert period to float
     df['Per'] = pd.to_numeric(df['Per'], errors='coerce')
 
+    # Drop the trailing rule line and any row without a KIC or period
+    df = df.dropna(subset=['KIC', 'Per']).reset_index(drop=True)
+
     # Calculate orbital frequency (d^-1)
     df['f_orb'] = 1.0 / df['Per']
 
@@ -86,6 +98,26 @@ def main():
     print(df[['KIC', 'Per', 'f_orb']].head(10))
     print()
 
+    # Extract f_puls from ingested light curves (kepler_lightcurves.py)
+    if (LIGHTCURVE_STORE / "index.json").exists():
+        from batch_periodogram import batch_dominant_frequencies
+        from harmonic_lattice import match_k
+
+        print("=" * 80)
+        print("K VALUES FROM INGESTED LIGHT CURVES")
+        print("=" * 80)
+        print()
+        freqs = batch_dominant_frequencies(df, str(LIGHTCURVE_STORE))
+        freqs = freqs[freqs['f_puls'].notna()]
+        lattice = match_k(freqs['f_puls'].values, freqs['f_orb'].values)
+        freqs['n'] = lattice['n']
+        freqs['k'] = lattice['k_int']
+        freqs['k_err_%'] = lattice['rel_error'] * 100
+        print(freqs[['KIC', 'f_orb', 'f_puls', 'n', 'k', 'k_err_%']].to_string(index=False))
+        print()
+        print(f"k values extracted for {len(freqs)} of {len(df)} systems")
+        print()
+
     print("=" * 80)
     print("NEXT STEPS TO EXTRACT K VALUES")
     print("=" * 80)
@@ -162,6 +194,14 @@ def main():
     print(f"Systems with periods 400-512 days (around 456): {len(near_456)}")
     print(f"Expected if uniform: ~{len(df) * 112 / (df['Per'].max() - df['Per'].min()):.1f}")
     print(f"Enrichment factor: {len(near_456) / (len(df) * 112 / (df['Per'].max() - df['Per'].min())):.2f}x")
+
+    # Significance against smooth period distributions (period_excess_null.py)
+    from period_excess_null import excess_significance
+    periods = df['Per'].dropna().values
+    for model in ('lognormal', 'kde'):
+        sig = excess_significance(periods, model, n_simulations=N_NULL_SIMULATIONS)
+        print(f"  Null ({model}): {sig['null_mean']:.2f} ± {sig['null_std']:.2f}x, "
+              f"p = {sig['p_value']:.2e} ({sig['n_simulations']:,} catalogs)")
     print()
 
     print("=" * 80)
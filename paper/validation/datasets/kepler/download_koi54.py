@@ -4,8 +4,14 @@ Download KOI-54 (KIC 5621294) Kepler light curves from MAST
 """
 
 from astroquery.mast import Observations
+from pathlib import Path
 import os
 
+# Same locations kepler_lightcurves.py reads by default
+KEPLER_DATA_DIR = Path(__file__).resolve().parent
+DOWNLOAD_DIR = KEPLER_DATA_DIR / "koi54_data"
+INGEST_SCRIPT = KEPLER_DATA_DIR.parents[3] / "scripts" / "kepler_lightcurves.py"
+
 # KOI-54 identifier
 target = "KIC 5621294"
 print(f"Searching for {target} observations...")
@@ -34,16 +40,19 @@ if len(kepler_obs) > 0:
     print("\nDownloading sample quarters...")
     manifest = Observations.download_products(
         lc_products[:5],
-        download_dir="./koi54_data"
+        download_dir=str(DOWNLOAD_DIR)
     )
 
     print(f"\nDownloaded {len(manifest)} files")
-    print("Files saved to: ./koi54_data/")
+    print(f"Files saved to: {DOWNLOAD_DIR}/")
 
     # List downloaded files
     print("\nDownloaded files:")
     for row in manifest:
         print(f"  {row['Local Path']}")
+
+    print("\nTo stitch these quarters into memory-mapped arrays:")
+    print(f"  python {INGEST_SCRIPT}")
 else:
     print("No Kepler observations found for KOI-54")
 
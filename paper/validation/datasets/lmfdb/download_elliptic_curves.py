@@ -2,58 +2,272 @@
 """
 Download elliptic curve data from LMFDB for murmuration analysis
 Conductor range: [7500, 10000] (as specified in paper)
+
+The conductor range is split into chunks that are fetched concurrently.
+Each chunk is paged through with _offset/_limit, and every completed page is
+written to disk as a packed .npz file and recorded in a progress file, so an
+interrupted run resumes from the last completed page.
+
+Pages are merged into one compact archive:
+    lmfdb_curves_7500_10000.npz
+        label      (n,)     curve labels (e.g. '7504.a1')
+        iso        (n,)     isogeny class labels
+        conductor  (n,)     int32
+        rank       (n,)     int8
+        primes     (25,)    int16, the primes p < 100
+        ap         (n, 25)  int16, a_p traces for each curve
+
+Downstream murmuration averaging should use load_curves() on that archive and
+never parse the verbose JSON again.
+
+Testing against a local stub (see stub_lmfdb_server.py):
+    python stub_lmfdb_server.py &
+    LMFDB_API_URL=http://127.0.0.1:8765/api/ python download_elliptic_curves.py
+or run test_download_elliptic_curves.py with pytest, which does the same.
 """
 
 import requests
 import json
+import os
 import time
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# LMFDB API endpoint (override with LMFDB_API_URL to point at a stub server)
+BASE_URL = os.environ.get("LMFDB_API_URL", "https://www.lmfdb.org/api/")
 
-# LMFDB API endpoint
-BASE_URL = "https://www.lmfdb.org/api/ec_curvedata/"
+# Curve metadata lives in ec_curvedata, a_p traces (p < 100) in ec_classdata
+CURVE_TABLE = "ec_curvedata"
+CLASS_TABLE = "ec_classdata"
+CURVE_FIELDS = ["lmfdb_label", "lmfdb_iso", "conductor", "rank"]
+CLASS_FIELDS = ["lmfdb_iso", "aplist"]
 
 # Query parameters for conductor range [7500, 10000]
-params = {
-    "conductor": {"$gte": 7500, "$lte": 10000},
-    "_format": "json",
-    "_limit": 10000  # Request large limit to get all curves
-}
+CONDUCTOR_MIN = 7500
+CONDUCTOR_MAX = 10000
+CHUNK_SIZE = 250         # Conductors per concurrently fetched range
+PAGE_LIMIT = 100         # Records per request (LMFDB API page size)
+N_WORKERS = 4
+MAX_RETRIES = 5
+
+# The 25 primes below 100, matching the LMFDB aplist layout
+PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+                   53, 59, 61, 67, 71, 73, 79, 83, 89, 97], dtype=np.int16)
+
+OUTPUT_DIR = "lmfdb_pages"
+PROGRESS_FILE = os.path.join(OUTPUT_DIR, "progress.json")
+OUTPUT_FILE = f"lmfdb_curves_{CONDUCTOR_MIN}_{CONDUCTOR_MAX}.npz"
+
+
+def conductor_chunks(c_min=CONDUCTOR_MIN, c_max=CONDUCTOR_MAX, size=CHUNK_SIZE):
+    """Split [c_min, c_max] into inclusive (lo, hi) conductor ranges"""
+    return [(lo, min(lo + size - 1, c_max)) for lo in range(c_min, c_max + 1, size)]
+
+
+def load_progress():
+    """Read the per-chunk progress file (empty if this is a fresh run)"""
+    if not os.path.exists(PROGRESS_FILE):
+        return {}
+    with open(PROGRESS_FILE) as f:
+        return json.load(f)
+
+
+def save_progress(progress):
+    """Write the progress file atomically so a crash never corrupts it"""
+    tmp = PROGRESS_FILE + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp, PROGRESS_FILE)
+
+
+def fetch_page(table, fields, lo, hi, offset, session):
+    """Fetch one page of a table for conductors in [lo, hi], with retries"""
+    params = {
+        "conductor": f"{lo}..{hi}",
+        "_format": "json",
+        "_fields": ",".join(fields),
+        "_offset": offset,
+        "_limit": PAGE_LIMIT,
+    }
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = session.get(BASE_URL + table + "/", params=params, timeout=60)
+            if response.status_code == 200:
+                data = response.json()
+                if isinstance(data, dict) and 'data' in data:
+                    return data['data']
+                return data if isinstance(data, list) else [data]
+            print(f"  HTTP {response.status_code} for {table} [{lo}, {hi}] offset {offset}")
+        except requests.RequestException as e:
+            print(f"  Request error for {table} [{lo}, {hi}] offset {offset}: {e}")
+        time.sleep(2 ** attempt)
+    raise RuntimeError(f"Giving up on {table} [{lo}, {hi}] offset {offset}")
+
+
+def pack_page(table, records):
+    """Convert one page of JSON records into packed arrays"""
+    if table == CURVE_TABLE:
+        return {
+            "label": np.array([r["lmfdb_label"] for r in records], dtype=str),
+            "iso": np.array([r["lmfdb_iso"] for r in records], dtype=str),
+            "conductor": np.array([r["conductor"] for r in records], dtype=np.int32),
+            "rank": np.array([r["rank"] for r in records], dtype=np.int8),
+        }
+    ap = np.zeros((len(records), len(PRIMES)), dtype=np.int16)
+    for i, r in enumerate(records):
+        aplist = r["aplist"][:len(PRIMES)]
+        ap[i, :len(aplist)] = aplist
+    return {
+        "iso": np.array([r["lmfdb_iso"] for r in records], dtype=str),
+        "ap": ap,
+    }
+
+
+def label_sort_key(label):
+    """
+    (conductor, class index, curve number) of an LMFDB label like '7504.ba12'
+
+    Class letters count in base 26 (a..z, ba, bb, ...), so 'z' sorts before
+    'ba' and curve 'a2' before 'a10', unlike a plain string sort.
+    """
+    conductor, rest = label.split(".")
+    letters = rest.rstrip("0123456789")
+    class_index = 0
+    for ch in letters:
+        class_index = 26 * class_index + ord(ch) - ord("a")
+    return int(conductor), class_index, int(rest[len(letters):])
+
+
+def page_path(table, lo, hi, offset):
+    return os.path.join(OUTPUT_DIR, f"{table}_{lo}_{hi}_{offset:06d}.npz")
+
+
+def ingest_chunk(table, fields, lo, hi, progress, lock):
+    """
+    Page through one conductor range, resuming at the last completed page
+
+    Returns:
+        Number of records fetched by this call (0 if already complete)
+    """
+    key = f"{table}:{lo}-{hi}"
+    with lock:
+        state = progress.get(key, {"next_offset": 0, "done": False})
+    if state["done"]:
+        return 0
+
+    fetched = 0
+    offset = state["next_offset"]
+    with requests.Session() as session:
+        while True:
+            records = fetch_page(table, fields, lo, hi, offset, session)
+            if records:
+                np.savez(page_path(table, lo, hi, offset), **pack_page(table, records))
+                fetched += len(records)
+            offset += len(records)
+            done = len(records) < PAGE_LIMIT
+            with lock:
+                progress[key] = {"next_offset": offset, "done": done}
+                save_progress(progress)
+            if done:
+                return fetched
+
+
+def merge_pages(chunks):
+    """Join curve metadata and class a_p pages into one compact archive"""
+    curves = {"label": [], "iso": [], "conductor": [], "rank": []}
+    classes = {"iso": [], "ap": []}
+
+    for lo, hi in chunks:
+        for table, store in ((CURVE_TABLE, curves), (CLASS_TABLE, classes)):
+            prefix = f"{table}_{lo}_{hi}_"
+            for name in sorted(os.listdir(OUTPUT_DIR)):
+                if name.startswith(prefix) and name.endswith(".npz"):
+                    with np.load(os.path.join(OUTPUT_DIR, name)) as page:
+                        for field in store:
+                            store[field].append(page[field])
+
+    if not curves["label"] or not classes["iso"]:
+        return 0
+
+    curves = {k: np.concatenate(v) for k, v in curves.items()}
+    class_iso = np.concatenate(classes["iso"])
+    class_ap = np.concatenate(classes["ap"])
+
+    # Every curve inherits the a_p of its isogeny class
+    order = np.argsort(class_iso)
+    pos = np.searchsorted(class_iso[order], curves["iso"])
+    pos = np.clip(pos, 0, len(order) - 1)
+    matched = class_iso[order][pos] == curves["iso"]
+    if not np.all(matched):
+        print(f"Warning: {np.sum(~matched)} curves have no a_p data, dropping them")
+    ap = class_ap[order][pos]
+
+    keep = matched
+    keys = [label_sort_key(label) for label in curves["label"][keep]]
+    sort = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.intp)
+    np.savez_compressed(
+        OUTPUT_FILE,
+        label=curves["label"][keep][sort],
+        iso=curves["iso"][keep][sort],
+        conductor=curves["conductor"][keep][sort],
+        rank=curves["rank"][keep][sort],
+        primes=PRIMES,
+        ap=ap[keep][sort],
+    )
+    return int(np.sum(keep))
+
+
+def load_curves(path=OUTPUT_FILE):
+    """
+    Load the packed curve archive
+
+    Returns:
+        dict of arrays: label, iso, conductor, rank, primes, ap
+    """
+    with np.load(path) as f:
+        return {k: f[k] for k in f.files}
 
-print("Querying LMFDB for elliptic curves with conductor in [7500, 10000]...")
-print(f"URL: {BASE_URL}")
 
-try:
-    response = requests.get(BASE_URL, params={"conductor": "7500..10000", "_format": "json"})
-    print(f"Status code: {response.status_code}")
+def main():
+    print(f"Querying LMFDB for elliptic curves with conductor in [{CONDUCTOR_MIN}, {CONDUCTOR_MAX}]...")
+    print(f"URL: {BASE_URL}")
 
-    if response.status_code == 200:
-        data = response.json()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    chunks = conductor_chunks()
+    progress = load_progress()
+    n_done = sum(1 for v in progress.values() if v["done"])
+    if n_done:
+        print(f"Resuming: {n_done} of {2 * len(chunks)} ranges already complete")
 
-        if isinstance(data, dict) and 'data' in data:
-            curves = data['data']
-        elif isinstance(data, list):
-            curves = data
-        else:
-            curves = [data]
+    lock = threading.Lock()
 
-        print(f"Retrieved {len(curves)} elliptic curves")
+    tasks = [(CURVE_TABLE, CURVE_FIELDS, lo, hi) for lo, hi in chunks]
+    tasks += [(CLASS_TABLE, CLASS_FIELDS, lo, hi) for lo, hi in chunks]
 
-        # Save to file
-        output_file = "lmfdb_curves_7500_10000.json"
-        with open(output_file, 'w') as f:
-            json.dump(curves, f, indent=2)
+    with ThreadPoolExecutor(max_workers=N_WORKERS) as pool:
+        futures = {pool.submit(ingest_chunk, *task, progress, lock): task for task in tasks}
+        for future in as_completed(futures):
+            table, _, lo, hi = futures[future]
+            print(f"  {table} [{lo}, {hi}]: {future.result()} new records")
 
-        print(f"Saved to: {output_file}")
+    n_curves = merge_pages(chunks)
+    print(f"Retrieved {n_curves} elliptic curves")
+    if n_curves == 0:
+        print("Nothing to save")
+        return
+    print(f"Saved to: {OUTPUT_FILE}")
 
-        # Print sample
-        if len(curves) > 0:
-            print("\nSample curve data:")
-            print(json.dumps(curves[0], indent=2))
+    # Print sample
+    curves = load_curves()
+    if len(curves["label"]) > 0:
+        print("\nSample curve data:")
+        print(f"  label={curves['label'][0]} conductor={curves['conductor'][0]} "
+              f"rank={curves['rank'][0]}")
+        print(f"  a_p (p<100): {curves['ap'][0].tolist()}")
 
-    else:
-        print(f"Error: HTTP {response.status_code}")
-        print(f"Response: {response.text[:500]}")
+    print("\nDone!")
 
-except Exception as e:
-    print(f"Error: {e}")
 
-print("\nDone!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Local stub of the LMFDB API for testing download_elliptic_curves.py
+
+Serves deterministic synthetic ec_curvedata / ec_classdata records with the
+same query conventions the ingest uses (conductor=lo..hi, _fields, _offset,
+_limit, _format=json) and the same {"data": [...], "next": ...} envelope.
+
+Usage:
+    python stub_lmfdb_server.py [port]
+    LMFDB_API_URL=http://127.0.0.1:8765/api/ python download_elliptic_curves.py
+"""
+
+import json
+import random
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PORT = 8765
+CLASSES_PER_CONDUCTOR = 2
+CURVES_PER_CLASS = 2
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+          53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
+
+
+def stub_records(table, lo, hi):
+    """Deterministic records for every conductor in [lo, hi]"""
+    records = []
+    for conductor in range(lo, hi + 1):
+        for c in range(CLASSES_PER_CONDUCTOR):
+            iso = f"{conductor}.{'abcdefgh'[c]}"
+            rng = random.Random(iso)
+            rank = rng.choice([0, 1, 2])
+            if table == "ec_classdata":
+                # a_p within the Hasse bound |a_p| <= 2 sqrt(p)
+                aplist = [rng.randint(-int(2 * p ** 0.5), int(2 * p ** 0.5)) for p in PRIMES]
+                records.append({"lmfdb_iso": iso, "conductor": conductor, "aplist": aplist})
+            else:
+                for i in range(1, CURVES_PER_CLASS + 1):
+                    records.append({"lmfdb_label": f"{iso}{i}", "lmfdb_iso": iso,
+                                    "conductor": conductor, "rank": rank})
+    return records
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        if len(parts) != 2 or parts[0] != 'api' or parts[1] not in ('ec_curvedata', 'ec_classdata'):
+            self.send_error(404)
+            return
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        lo, hi = (int(x) for x in query.get('conductor', '1..100').split('..'))
+        offset = int(query.get('_offset', 0))
+        limit = int(query.get('_limit', 100))
+
+        records = stub_records(parts[1], lo, hi)
+        if '_fields' in query:
+            fields = query['_fields'].split(',')
+            records = [{f: r[f] for f in fields if f in r} for r in records]
+
+        page = records[offset:offset + limit]
+        body = {"table": parts[1], "offset": offset, "data": page}
+        if offset + limit < len(records):
+            body["next"] = f"{url.path}?conductor={lo}..{hi}&_offset={offset + limit}"
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    print(f"Stub LMFDB API on http://127.0.0.1:{port}/api/")
+    server.serve_forever()
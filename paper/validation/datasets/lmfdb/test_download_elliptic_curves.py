@@ -0,0 +1,51 @@
+"""
+End-to-end check of download_elliptic_curves.py against stub_lmfdb_server.py
+
+Run with:
+    python -m pytest paper/validation/datasets/lmfdb
+"""
+
+import functools
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+import download_elliptic_curves as dl
+import stub_lmfdb_server as stub
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), stub.StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_against_stub(stub_server, tmp_path, monkeypatch):
+    # Eleven curves per class so labels run a1 ... a11
+    monkeypatch.setattr(stub, "CURVES_PER_CLASS", 11)
+    monkeypatch.setattr(dl, "BASE_URL", stub_server)
+    monkeypatch.setattr(dl, "conductor_chunks", functools.partial(dl.conductor_chunks, 7500, 7519, 10))
+    monkeypatch.chdir(tmp_path)
+
+    dl.main()
+    curves = dl.load_curves()
+
+    expected = stub.stub_records("ec_curvedata", 7500, 7519)
+    assert curves["label"].tolist() == [r["lmfdb_label"] for r in expected]
+    assert curves["conductor"].tolist() == [r["conductor"] for r in expected]
+    assert curves["rank"].tolist() == [r["rank"] for r in expected]
+
+    aplist = {r["lmfdb_iso"]: r["aplist"] for r in stub.stub_records("ec_classdata", 7500, 7519)}
+    np.testing.assert_array_equal(curves["ap"], [aplist[iso] for iso in curves["iso"]])
+    np.testing.assert_array_equal(curves["primes"], stub.PRIMES)
+
+
+def test_label_sort_key():
+    labels = ["7504.ba1", "7504.a10", "7500.z1", "7504.a2", "7504.z3"]
+    assert sorted(labels, key=dl.label_sort_key) == ["7500.z1", "7504.a2", "7504.a10", "7504.z3", "7504.ba1"]
@@ -18,6 +18,9 @@ from scipy.spatial.distance import pdist
 import glob
 import os
 
+from feature_embeddings import BASELINE_SPEC, embed, feature_table
+from loglog_fit import correlation_slopes
+
 # TFA Prediction
 TFA_PREDICTED_D2 = 1.45
 TFA_PREDICTED_ERROR = 0.10
@@ -40,8 +43,13 @@ def load_all_events(events_dir='events'):
     print(f"\nTotal: {len(combined):,} events")
     return combined
 
-def prepare_features(df, sample_size=10000):
-    """Prepare normalized features for D2 calculation."""
+def prepare_features(df, sample_size=10000, spec=BASELINE_SPEC):
+    """
+    Prepare normalized features for D2 calculation.
+
+    spec is a feature spec from feature_embeddings.py; the default is
+    [log10(E), sin(Dec)], each normalized to [0, 1] over the sample.
+    """
     # Sample if too large (for computational efficiency)
     if len(df) > sample_size:
         df_sample = df.sample(n=sample_size, random_state=42)
@@ -49,18 +57,10 @@ def prepare_features(df, sample_size=10000):
     else:
         df_sample = df
 
-    # Features: log10(E), sin(Dec)
-    log_e = df_sample['log10E'].values
-    sin_dec = np.sin(np.radians(df_sample['Dec'].values))
-
-    # Normalize to [0, 1]
-    log_e_norm = (log_e - log_e.min()) / (log_e.max() - log_e.min())
-    sin_dec_norm = (sin_dec - sin_dec.min()) / (sin_dec.max() - sin_dec.min())
+    return embed(feature_table(df_sample, [spec]), spec)
 
-    return np.column_stack([log_e_norm, sin_dec_norm])
-
-def grassberger_procaccia(features, n_radii=30):
-    """Calculate D2 using Grassberger-Procaccia algorithm."""
+def correlation_curve(features, n_radii=30):
+    """Radii and correlation sums C(r) of the Grassberger-Procaccia algorithm."""
     N = len(features)
     distances = pdist(features, metric='euclidean')
 
@@ -72,25 +72,19 @@ def grassberger_procaccia(features, n_radii=30):
     for r in r_values:
         count = np.sum(distances < r)
         C_r.append(2.0 * count / (N * (N - 1)))
-    C_r = np.array(C_r)
+    return r_values, np.array(C_r)
 
-    # Scaling region
-    valid = (C_r > 0.01) & (C_r < 0.99)
-    if np.sum(valid) < 5:
-        return np.nan, np.nan
-
-    log_r = np.log(r_values[valid])
-    log_C = np.log(C_r[valid])
-
-    coeffs, cov = np.polyfit(log_r, log_C, 1, cov=True)
-    D2 = coeffs[0]
-    error = np.sqrt(cov[0, 0])
+def grassberger_procaccia(features, n_radii=30):
+    """Calculate D2 using Grassberger-Procaccia algorithm."""
+    r_values, C_r = correlation_curve(features, n_radii)
 
-    return D2, error
+    # Scaling region 0.01 < C < 0.99 (loglog_fit.correlation_slopes)
+    D2, error = correlation_slopes(r_values, C_r)
+    return D2[0], error[0]
 
 def bootstrap_d2(features, n_bootstrap=30):
     """Bootstrap estimation of D2 uncertainty."""
-    d2_samples = []
+    r_values, C_r = [], []
     N = len(features)
 
     for i in range(n_bootstrap):
@@ -98,9 +92,13 @@ def bootstrap_d2(features, n_bootstrap=30):
             print(f"  Bootstrap {i+1}/{n_bootstrap}")
         indices = np.random.choice(N, size=N, replace=True)
         sample = features[indices]
-        d2, _ = grassberger_procaccia(sample)
-        if not np.isnan(d2):
-            d2_samples.append(d2)
+        r, C = correlation_curve(sample)
+        r_values.append(r)
+        C_r.append(C)
+
+    # All replicates fitted in one batch
+    d2_samples, _ = correlation_slopes(np.array(r_values), np.array(C_r))
+    d2_samples = d2_samples[~np.isnan(d2_samples)]
 
     return np.mean(d2_samples), np.std(d2_samples)
 
@@ -8,9 +8,11 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy.stats import pearsonr
-from scipy.optimize import curve_fit
 import json
 from datetime import datetime
+from harmonic_lattice import base_coherence_scan, lattice_window_counts
+from k_histogram_null import chi2_significance
+from batch_fit import fit_models, bootstrap_weights
 
 # Output file for results
 RESULTS_FILE = '/mnt/user-data/outputs/analysis_results.json'
@@ -138,12 +140,20 @@ try:
     log("TEST 2: 456/k Harmonic Clustering")
     log("="*70)
     
+    # Window counts around every lattice point 456/n at once
+    windows = lattice_window_counts(df['k_inferred'].values, 456.0, 456, (0.5, 1.0, 2.0))
+    counts_2 = windows['counts'][list(windows['widths']).index(2.0)]
+    
     harmonic_peaks = {}
     for n in range(6, 13):
-        k_pred = 456 / n
+        k_pred = windows['k_pred'][n - 1]
         if 30 < k_pred < 80:
-            nearby = int(np.sum((df['k_inferred'] >= k_pred - 2) & (df['k_inferred'] <= k_pred + 2)))
-            harmonic_peaks[f'n_{n}'] = {'k_pred': k_pred, 'count': nearby}
+            nearby = int(counts_2[n - 1])
+            harmonic_peaks[f'n_{n}'] = {
+                'k_pred': k_pred,
+                'count': nearby,
+                'counts_by_width': {f'{w:g}': int(c) for w, c in zip(windows['widths'], windows['counts'][:, n - 1])}
+            }
             log(f"  n={n:2d}: k={k_pred:5.1f} → {nearby:5d} stars within ±2")
     
     save_result('harmonic_peaks', harmonic_peaks)
@@ -157,10 +167,43 @@ try:
         'expected_uniform': 50,
         'verdict': 'CLUSTERED' if chi_squared > 100 else 'WEAK'
     }
+    
+    # Null distribution from a smooth fit to k (resampled histograms)
+    chi2_null = chi2_significance(df['k_inferred'].values)
+    clustering_test['null'] = chi2_null
     save_result('clustering_test', clustering_test)
     
     log(f"\nUniformity test (χ²): {chi_squared:.1f}")
     log(f"  {'✓ Strong clustering' if chi_squared > 100 else '○ Weak clustering'}")
+    log(f"  Smooth-null χ²: {chi2_null['chi2_null_mean']:.1f} ± {chi2_null['chi2_null_std']:.1f} "
+        f"→ p = {chi2_null['p_chi2']:.4f} ({chi2_null['n_resamples']} resamples)")
+    log(f"  Strongest bin: k={chi2_null['best_bin_k']:.1f}, z = {chi2_null['best_bin_z']:.2f}, "
+        f"p_local = {chi2_null['p_local']:.4f}, p_global = {chi2_null['p_global']:.4f}")
+    
+    # TEST 2b: IS 456 SPECIAL? Coherence of k = N₀/n across trial bases
+    log("\n" + "="*70)
+    log("TEST 2b: Lattice Coherence vs Trial Base N₀ (300-600)")
+    log("="*70)
+    
+    scan = base_coherence_scan(df['n_ratio'].values, 300.0, 600.0, 0.01)
+    bases, power = scan['bases'], scan['power']
+    z_456 = float(power[np.argmin(np.abs(bases - 456))])
+    best = int(np.argmax(power))
+    
+    base_scan = {
+        'n_bases': len(bases),
+        'rayleigh_z_456': z_456,
+        'p_single_trial_456': float(np.exp(-z_456)),
+        'best_base': float(bases[best]),
+        'rayleigh_z_best': float(power[best]),
+        'fraction_of_bases_above_456': float(np.mean(power > z_456)),
+        'median_z': float(np.median(power))
+    }
+    save_result('base_scan', base_scan)
+    
+    log(f"\nRayleigh Z at N₀=456: {z_456:.2f} (single-trial p = {base_scan['p_single_trial_456']:.2e})")
+    log(f"Best trial base: {base_scan['best_base']:.2f} (Z = {base_scan['rayleigh_z_best']:.2f})")
+    log(f"Bases more coherent than 456: {base_scan['fraction_of_bases_above_456'] * 100:.1f}% of {len(bases):,}")
     
     # TEST 3: EVOLUTION CORRELATION
     log("\n" + "="*70)
@@ -229,37 +272,67 @@ try:
         R_fit = R_data[mask]
         k_fit = k_data[mask]
         
-        def complex_exp(R, a, b, c):
-            return a + b * np.exp(c * R)
+        phase_fit = df.loc[valid_radius, 'Phase'].values[mask]
+        subsets = {
+            'all': np.ones(len(R_fit)),
+            'rgb': (phase_fit == 1).astype(float),
+            'heb': (phase_fit == 2).astype(float),
+            'bootstrap': bootstrap_weights(len(R_fit), 100),
+        }
+        subsets = {name: w for name, w in subsets.items() if np.atleast_2d(w).sum(axis=1).min() > 10}
         
-        def real_power(R, a, b, c):
-            return a + b * (R ** c)
+        # Multi-start batched fits of both model families on every subset at once
+        fits = fit_models(R_fit, k_fit, subsets)
+        exp_fit, pow_fit = fits['complex_exp'], fits['real_power']
         
-        try:
-            popt_exp, _ = curve_fit(complex_exp, R_fit, k_fit, p0=[40, 1, 0.1], maxfev=5000)
-            popt_pow, _ = curve_fit(real_power, R_fit, k_fit, p0=[30, 1, 0.5], maxfev=5000)
-            
-            pred_exp = complex_exp(R_fit, *popt_exp)
-            pred_pow = real_power(R_fit, *popt_pow)
-            
-            ss_tot = np.sum((k_fit - np.mean(k_fit))**2)
-            r2_exp = float(1 - np.sum((k_fit - pred_exp)**2) / ss_tot)
-            r2_pow = float(1 - np.sum((k_fit - pred_pow)**2) / ss_tot)
+        if exp_fit['all']['converged'][0] and pow_fit['all']['converged'][0]:
+            r2_exp = float(exp_fit['all']['r2'][0])
+            r2_pow = float(pow_fit['all']['r2'][0])
             
             formulation_test = {
                 'r2_complex': r2_exp,
                 'r2_real': r2_pow,
+                'params_complex': exp_fit['all']['theta'][0].tolist(),
+                'params_real': pow_fit['all']['theta'][0].tolist(),
                 'winner': 'REAL' if r2_pow >= r2_exp * 0.95 else 'COMPLEX'
             }
+            if 'bootstrap' in subsets:
+                ok = exp_fit['bootstrap']['converged'] & pow_fit['bootstrap']['converged']
+                boot_exp = exp_fit['bootstrap']['r2'][ok]
+                boot_pow = pow_fit['bootstrap']['r2'][ok]
+                formulation_test.update({
+                    'n_bootstrap_converged': int(np.sum(ok)),
+                    'r2_complex_std': float(np.std(boot_exp)),
+                    'r2_real_std': float(np.std(boot_pow)),
+                    'delta_r2_mean': float(np.mean(boot_pow - boot_exp)),
+                    'delta_r2_std': float(np.std(boot_pow - boot_exp)),
+                    'fraction_real_wins': float(np.mean(boot_pow >= boot_exp * 0.95))
+                })
+            for phase_name in ('rgb', 'heb'):
+                if phase_name in subsets:
+                    formulation_test[f'r2_complex_{phase_name}'] = float(exp_fit[phase_name]['r2'][0])
+                    formulation_test[f'r2_real_{phase_name}'] = float(pow_fit[phase_name]['r2'][0])
             save_result('formulation_test', formulation_test)
             
             log(f"\nFunctional form comparison:")
-            log(f"  Complex exp: R² = {r2_exp:.4f}")
-            log(f"  Real power:  R² = {r2_pow:.4f}")
+            if 'r2_complex_std' in formulation_test:
+                log(f"  Complex exp: R² = {r2_exp:.4f} ± {formulation_test['r2_complex_std']:.4f}")
+                log(f"  Real power:  R² = {r2_pow:.4f} ± {formulation_test['r2_real_std']:.4f}")
+                log(f"  ΔR² (real - complex) = {formulation_test['delta_r2_mean']:.4f} "
+                    f"± {formulation_test['delta_r2_std']:.4f} "
+                    f"({formulation_test['n_bootstrap_converged']} bootstrap fits)")
+            else:
+                log(f"  Complex exp: R² = {r2_exp:.4f}")
+                log(f"  Real power:  R² = {r2_pow:.4f}")
+            for phase_name in ('rgb', 'heb'):
+                if f'r2_real_{phase_name}' in formulation_test:
+                    log(f"  {phase_name.upper()}: complex R² = {formulation_test[f'r2_complex_{phase_name}']:.4f}, "
+                        f"real R² = {formulation_test[f'r2_real_{phase_name}']:.4f}")
             log(f"  ✓ {formulation_test['winner']} formulation wins")
-        except Exception as e:
-            log(f"  Fitting error: {e}")
-            save_result('formulation_test', {'error': str(e)})
+        else:
+            failed = [m for m, f in fits.items() if not f['all']['converged'][0]]
+            log(f"  Fitting error: no start converged for {', '.join(failed)}")
+            save_result('formulation_test', {'error': f"not converged: {failed}"})
     
     # PHASE ANALYSIS
     log("\n" + "="*70)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Full-Sky Two-Point Angular Correlation of IceCube Events
+
+Measures w(θ) for the 10-year point-source events on the sky (RA, Dec) with
+the Landy & Szalay (1993) estimator
+
+    w(θ) = (DD - 2 DR + RR) / RR
+
+where DD, DR and RR are normalised pair counts per θ bin among data events,
+between data and randoms, and among randoms. calculate_d2.py only ever
+correlates zenith differences; this uses the full direction of each event.
+
+Directions are unit vectors, so an angular separation θ is a chord
+2 sin(θ/2) and pairs are counted with KD-trees on the chord distance
+(pair_counts.tree_pair_counts, split across cores). Random catalogs are
+uniform in RA and follow the observed sin(Dec) distribution, which carries
+the detector's declination acceptance.
+
+The power-law slope α of w(θ) ∝ θ^(-α) is compared with the DFA value 0.45.
+
+Usage:
+    python angular_correlation_sky.py [events_dir]
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+import sys
+
+from analyze_10yr_d2 import load_all_events
+from loglog_fit import correlation_slopes
+from pair_counts import tree_pair_counts
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+THETA_MIN = 0.1            # Degrees
+THETA_MAX = 10.0           # Degrees
+N_THETA_BINS = 20
+RANDOM_FACTOR = 2          # Random catalog size / data size
+ACCEPTANCE_BINS = 200      # sin(Dec) histogram used to draw randoms
+SEED = 456
+
+DFA_ALPHA = 0.45
+DFA_ALPHA_ERROR = 0.05
+
+# ============================================================================
+# SKY GEOMETRY AND RANDOMS
+# ============================================================================
+
+def unit_vectors(ra_deg: np.ndarray, dec_deg: np.ndarray) -> np.ndarray:
+    """(N, 3) Cartesian unit vectors from RA/Dec in degrees"""
+    ra, dec = np.radians(ra_deg), np.radians(dec_deg)
+    cos_dec = np.cos(dec)
+    return np.column_stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)])
+
+
+def chord(theta_deg: np.ndarray) -> np.ndarray:
+    """Chord length on the unit sphere for an angular separation in degrees"""
+    return 2 * np.sin(np.radians(theta_deg) / 2)
+
+
+def acceptance_randoms(dec_deg: np.ndarray, n_random: int, n_bins: int = ACCEPTANCE_BINS,
+                       seed: int = SEED) -> np.ndarray:
+    """
+    Random directions, uniform in RA, with sin(Dec) drawn from the data.
+
+    sin(Dec) is drawn from a fine histogram of the observed values (uniform
+    within each bin), so the randoms follow the declination acceptance
+    without copying individual events.
+
+    Returns:
+        (n_random, 2) array of (RA, Dec) in degrees
+    """
+    rng = np.random.default_rng(seed)
+    counts, edges = np.histogram(np.sin(np.radians(dec_deg)), bins=n_bins, range=(-1, 1))
+    bins = rng.choice(n_bins, size=n_random, p=counts / counts.sum())
+    sin_dec = edges[bins] + rng.random(n_random) * (edges[1] - edges[0])
+    ra = rng.uniform(0, 360, n_random)
+    return np.column_stack([ra, np.degrees(np.arcsin(np.clip(sin_dec, -1, 1)))])
+
+# ============================================================================
+# ESTIMATOR
+# ============================================================================
+
+def landy_szalay(data_xyz: np.ndarray, random_xyz: np.ndarray,
+                 theta_edges: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Landy-Szalay w(θ) in angular bins.
+
+    Args:
+        data_xyz: (N, 3) unit vectors of the events
+        random_xyz: (M, 3) unit vectors of the randoms
+        theta_edges: Bin edges in degrees
+
+    Returns:
+        dict of arrays: theta (bin centres, geometric), w, DD, DR, RR (raw
+        unordered pair counts per bin)
+    """
+    radii = chord(theta_edges)
+    n_d, n_r = len(data_xyz), len(random_xyz)
+
+    # Auto counts are ordered and include self-pairs; differencing removes the
+    # self-pairs (distance 0 lies below the first edge)
+    dd = np.diff(tree_pair_counts(data_xyz, data_xyz, radii)) / 2
+    rr = np.diff(tree_pair_counts(random_xyz, random_xyz, radii)) / 2
+    dr = np.diff(tree_pair_counts(data_xyz, random_xyz, radii))
+
+    DD = dd / (n_d * (n_d - 1) / 2)
+    RR = rr / (n_r * (n_r - 1) / 2)
+    DR = dr / (n_d * n_r)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = (DD - 2 * DR + RR) / RR
+
+    return {
+        'theta': np.sqrt(theta_edges[:-1] * theta_edges[1:]),
+        'w': w,
+        'DD': dd,
+        'DR': dr,
+        'RR': rr,
+    }
+
+
+def power_law_slope(theta: np.ndarray, w: np.ndarray):
+    """Fit w ∝ θ^(-α) over bins with w > 0 (at least 3); returns (α, error)"""
+    slope, error = correlation_slopes(theta, w, c_min=0.0, c_max=np.inf, min_points=3)
+    return -slope[0], error[0]
+
+
+def main():
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else 'events'
+
+    print("=" * 70)
+    print("FULL-SKY ANGULAR CORRELATION w(θ): Landy-Szalay")
+    print("=" * 70)
+    print()
+
+    df = load_all_events(events_dir)
+    data_xyz = unit_vectors(df['RA'].values, df['Dec'].values)
+
+    n_random = RANDOM_FACTOR * len(df)
+    randoms = acceptance_randoms(df['Dec'].values, n_random)
+    random_xyz = unit_vectors(randoms[:, 0], randoms[:, 1])
+    print(f"Randoms: {n_random:,} (uniform RA, sin(Dec) from data)")
+
+    theta_edges = np.logspace(np.log10(THETA_MIN), np.log10(THETA_MAX), N_THETA_BINS + 1)
+    print(f"θ bins: {N_THETA_BINS} from {THETA_MIN}° to {THETA_MAX}°")
+    print("Counting DD, DR, RR pairs...")
+    result = landy_szalay(data_xyz, random_xyz, theta_edges)
+
+    print()
+    print(f"  {'θ (deg)':>9s}  {'w(θ)':>10s}  {'DD':>14s}  {'RR':>14s}")
+    for theta, w, dd, rr in zip(result['theta'], result['w'], result['DD'], result['RR']):
+        print(f"  {theta:9.3f}  {w:10.5f}  {dd:14,.0f}  {rr:14,.0f}")
+
+    alpha, alpha_error = power_law_slope(result['theta'], result['w'])
+    print()
+    print(f"Angular slope: α = {alpha:.3f} ± {alpha_error:.3f}")
+    print(f"DFA Prediction: α = {DFA_ALPHA} ± {DFA_ALPHA_ERROR}")
+
+    pd.DataFrame(result).to_csv('angular_correlation_sky.csv', index=False)
+    print("\n✓ Saved: angular_correlation_sky.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Batch Lomb-Scargle Periodogram Engine
+
+Extracts the dominant pulsation frequency f_puls above the orbital frequency
+for every light curve in the store written by kepler_lightcurves.py, so that
+k = 456 / (f_puls / f_orb) can be computed for the whole Kirk+2016 catalog.
+
+The periodogram uses the Press & Rybicki (1989) extirpolation method: the
+trigonometric sums are spread onto a regular grid with Lagrange weights and
+evaluated with one FFT, giving O(N log N) cost instead of the O(N·F) direct
+sum. Light curves are processed in parallel, one process per target.
+
+The periodogram is assembled from two pieces that prewhiten.py and
+streaming_periodogram.py also use directly: the data-independent window
+terms, computed once per sampling, and the data projections. All callers
+share the one extirpolation backend below (extirpolate, trig_sum), adapted
+from astropy's fast Lomb-Scargle implementation; see the licence notice
+above extirpolate.
+
+Usage:
+    python batch_periodogram.py [store_dir] [catalog_file]
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+from typing import Dict, Tuple
+import os
+import sys
+
+from kepler_lightcurves import STORE_DIR, load_index, open_lightcurve
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+KIRK_CATALOG = '../paper/validation/datasets/kepler/kirk2016_heartbeat_catalog.dat'
+
+OVERSAMPLING = 5         # Frequency grid oversampling (df = 1 / (OVERSAMPLING × baseline))
+F_MAX = 24.47            # Kepler long-cadence Nyquist frequency (d⁻¹)
+MIN_RATIO = 1.5          # f_puls must exceed MIN_RATIO × f_orb
+FFT_OVERSAMPLING = 5     # Extirpolation grid oversampling
+MFFT = 4                 # Number of grid points each sample is extirpolated onto
+N_WORKERS = os.cpu_count()
+
+# ============================================================================
+# FAST LOMB-SCARGLE
+# ============================================================================
+
+# _bitceil, extirpolate and trig_sum are adapted from astropy
+# (astropy/timeseries/periodograms/lombscargle/implementations/utils.py):
+#
+# Copyright (c) 2011-2026, Astropy Developers
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# * Redistributions of source code must retain the above copyright notice,
+#   this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above copyright notice,
+#   this list of conditions and the following disclaimer in the documentation
+#   and/or other materials provided with the distribution.
+# * Neither the name of the Astropy Team nor the names of its contributors may
+#   be used to endorse or promote products derived from this software without
+#   specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+def _bitceil(n: int) -> int:
+    """Smallest power of 2 >= n"""
+    return 1 << int(np.ceil(np.log2(max(n, 1))))
+
+
+def extirpolate(x: np.ndarray, y: np.ndarray, n: int, m: int = MFFT) -> np.ndarray:
+    """
+    Spread values y at fractional positions x onto an integer grid of length n.
+
+    The result satisfies sum(y * f(x)) ≈ sum(grid * f(arange(n))) for any
+    smooth f, using m-point Lagrange weights.
+    """
+    result = np.zeros(n, dtype=y.dtype)
+
+    integers = x % 1 == 0
+    np.add.at(result, x[integers].astype(int), y[integers])
+    x, y = x[~integers], y[~integers]
+
+    ilo = np.clip((x - m // 2).astype(int), 0, n - m)
+    numerator = y * np.prod(x - ilo - np.arange(m)[:, None], 0)
+    denominator = factorial(m - 1)
+    for j in range(m):
+        if j > 0:
+            denominator *= j / (j - m)
+        ind = ilo + (m - 1 - j)
+        np.add.at(result, ind, numerator / (denominator * (x - ind)))
+    return result
+
+
+def trig_sum(t: np.ndarray, h: np.ndarray, f0: float, df: float, n_freq: int,
+             freq_factor: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute S_k = Σ h sin(2π f_k t) and C_k = Σ h cos(2π f_k t)
+    for f_k = freq_factor × (f0 + k·df), k = 0 … n_freq-1, via extirpolation + FFT.
+    """
+    df = df * freq_factor
+    f0 = f0 * freq_factor
+    n_fft = _bitceil(n_freq * FFT_OVERSAMPLING)
+
+    t0 = t.min()
+    h = h.astype(complex)
+    if f0 > 0:
+        h = h * np.exp(2j * np.pi * f0 * (t - t0))
+    tnorm = ((t - t0) * n_fft * df) % n_fft
+    grid = extirpolate(tnorm, h, n_fft, MFFT)
+    fftgrid = np.fft.ifft(grid)[:n_freq]
+    if t0 != 0:
+        f = f0 + df * np.arange(n_freq)
+        fftgrid *= np.exp(2j * np.pi * t0 * f)
+
+    return n_fft * fftgrid.imag, n_fft * fftgrid.real
+
+
+def window_terms(t: np.ndarray, w: np.ndarray, f0: float, df: float,
+                 n_freq: int) -> Dict[str, np.ndarray]:
+    """
+    Data-independent part of the floating-mean Lomb-Scargle periodogram.
+
+    Depends only on the sampling and weights, so it can be computed once and
+    reused for any number of y vectors on the same time stamps.
+
+    Args:
+        t: Times
+        w: Weights normalised to sum to 1
+        f0, df, n_freq: Regular frequency grid
+
+    Returns:
+        dict of (n_freq,) arrays: Cw, Sw (cos/sin of ωτ), CC, SS (centred
+        weighted norms of the rotated cos and sin bases)
+    """
+    S2, C2 = trig_sum(t, w, f0, df, n_freq, freq_factor=2)
+    S, C = trig_sum(t, w, f0, df, n_freq)
+
+    tan_2omega_tau = (S2 - 2 * S * C) / (C2 - (C * C - S * S))
+    S2w = tan_2omega_tau / np.sqrt(1 + tan_2omega_tau ** 2)
+    C2w = 1 / np.sqrt(1 + tan_2omega_tau ** 2)
+    Cw = np.sqrt(0.5) * np.sqrt(1 + C2w)
+    Sw = np.sqrt(0.5) * np.sign(S2w) * np.sqrt(1 - C2w)
+
+    return {
+        'Cw': Cw,
+        'Sw': Sw,
+        'CC': 0.5 * (1 + C2 * C2w + S2 * S2w) - (C * Cw + S * Sw) ** 2,
+        'SS': 0.5 * (1 - C2 * C2w - S2 * S2w) - (S * Cw - C * Sw) ** 2,
+    }
+
+
+def projections(t: np.ndarray, wy: np.ndarray, terms: Dict[str, np.ndarray],
+                f0: float, df: float, n_freq: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(YC, YS): weighted, mean-subtracted y projected on the rotated cos/sin bases"""
+    Sh, Ch = trig_sum(t, wy, f0, df, n_freq)
+    return Ch * terms['Cw'] + Sh * terms['Sw'], Sh * terms['Cw'] - Ch * terms['Sw']
+
+
+def fast_lomb_scargle(t: np.ndarray, y: np.ndarray, dy: np.ndarray,
+                      f0: float, df: float, n_freq: int) -> np.ndarray:
+    """
+    Floating-mean generalised Lomb-Scargle power on a regular frequency grid.
+
+    Args:
+        t, y, dy: Times, values and uncertainties
+        f0: First grid frequency
+        df: Grid spacing
+        n_freq: Number of grid frequencies
+
+    Returns:
+        Power normalised to [0, 1] ("standard" normalisation)
+    """
+    w = dy ** -2.0
+    w /= w.sum()
+    y = y - np.dot(w, y)
+
+    terms = window_terms(t, w, f0, df, n_freq)
+    YC, YS = projections(t, w * y, terms, f0, df, n_freq)
+    YY = np.dot(w, y ** 2)
+
+    return (YC * YC / terms['CC'] + YS * YS / terms['SS']) / YY
+
+
+def frequency_grid(baseline: float, f_max: float = F_MAX,
+                   oversampling: int = OVERSAMPLING) -> Tuple[float, float, int]:
+    """Regular grid (f0, df, n_freq) resolving 1/baseline with the given oversampling"""
+    df = 1.0 / (oversampling * baseline)
+    n_freq = int(f_max / df)
+    return df, df, n_freq
+
+# ============================================================================
+# BATCH ENGINE
+# ============================================================================
+
+def dominant_frequency(kic: int, f_orb: float, store_dir: str = STORE_DIR,
+                       min_ratio: float = MIN_RATIO) -> dict:
+    """
+    Find the strongest periodogram peak above min_ratio × f_orb for one target.
+
+    Returns:
+        dict with KIC, f_orb, f_puls, power, n_points
+    """
+    time, flux, flux_err = open_lightcurve(kic, store_dir)
+    t = np.asarray(time, dtype=np.float64)
+    y = np.asarray(flux, dtype=np.float64)
+    dy = np.asarray(flux_err, dtype=np.float64)
+
+    f0, df, n_freq = frequency_grid(t[-1] - t[0])
+    power = fast_lomb_scargle(t, y, dy, f0, df, n_freq)
+    freqs = f0 + df * np.arange(n_freq)
+
+    above = freqs > min_ratio * f_orb
+    if not np.any(above):
+        return {'KIC': kic, 'f_orb': f_orb, 'f_puls': np.nan, 'power': np.nan, 'n_points': len(t)}
+
+    i = np.nonzero(above)[0][np.argmax(power[above])]
+    return {'KIC': kic, 'f_orb': f_orb, 'f_puls': freqs[i], 'power': power[i], 'n_points': len(t)}
+
+
+def _dominant_frequency_job(args):
+    return dominant_frequency(*args)
+
+
+def batch_dominant_frequencies(catalog: pd.DataFrame, store_dir: str = STORE_DIR,
+                               n_workers: int = N_WORKERS) -> pd.DataFrame:
+    """
+    Run dominant_frequency() over every catalog target present in the store.
+
+    Args:
+        catalog: DataFrame with KIC and f_orb columns
+        store_dir: Light curve store directory
+        n_workers: Number of worker processes
+
+    Returns:
+        DataFrame with KIC, f_orb, f_puls, power, n_points
+    """
+    index = load_index(store_dir)
+    jobs = [(int(kic), float(f_orb), store_dir)
+            for kic, f_orb in zip(catalog['KIC'], catalog['f_orb'])
+            if not pd.isna(kic) and not pd.isna(f_orb) and str(int(kic)) in index and np.isfinite(f_orb)]
+
+    if not jobs:
+        return pd.DataFrame(columns=['KIC', 'f_orb', 'f_puls', 'power', 'n_points'])
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        rows = list(pool.map(_dominant_frequency_job, jobs))
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    store_dir = sys.argv[1] if len(sys.argv) > 1 else STORE_DIR
+    catalog_file = sys.argv[2] if len(sys.argv) > 2 else KIRK_CATALOG
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+    from extract_k_from_catalog import load_kirk_catalog
+    from harmonic_lattice import match_k
+
+    print("=" * 70)
+    print("Batch Lomb-Scargle: dominant f_puls for the Kirk+2016 catalog")
+    print("=" * 70)
+
+    catalog = load_kirk_catalog(catalog_file)
+    print(f"Catalog: {len(catalog)} systems")
+    print(f"Light curves in store: {len(load_index(store_dir))}")
+
+    results = batch_dominant_frequencies(catalog, store_dir)
+    print(f"Processed {len(results)} systems")
+    print()
+
+    results = results[results['f_puls'].notna()]
+    lattice = match_k(results['f_puls'].values, results['f_orb'].values)
+    for row, n, k in zip(results.itertuples(), lattice['n'], lattice['k_int']):
+        print(f"  KIC {row.KIC:9d}: f_orb = {row.f_orb:.5f}  f_puls = {row.f_puls:.5f} d⁻¹  "
+              f"n = {n:7.2f}  k = {k}")
+
+
+if __name__ == '__main__':
+    main()
@@ -14,9 +14,13 @@ Repository: https://github.com/relativelyeducated/dialectical-fractal-theory
 import numpy as np
 import pandas as pd
 from scipy.spatial.distance import cdist
-from sklearn.cluster import DBSCAN
 import matplotlib.pyplot as plt
-from typing import Tuple, List
+from typing import Dict, Tuple, List
+
+from cluster_hierarchy import cluster_scan
+from grid_dbscan import grid_dbscan, summarize_clusters
+from loglog_fit import batch_linear_fit, scaling_region
+from pair_counts import separation_histogram, tiled_pair_counts
 
 # ============================================================================
 # CONFIGURATION
@@ -25,12 +29,16 @@ from typing import Tuple, List
 # Data file path (adjust as needed)
 DATA_FILE = 'data.dat'  # Format: Energy(GeV) Zenith(radians)
 
+# Event-space coordinates for D₂ and clustering (columns of load_icecube_data)
+FEATURE_COLUMNS = ['Log_E', 'Cos_Zenith']
+
 # Correlation dimension parameters
 SAMPLE_SIZE = 10000      # Subsample for computational efficiency
 R_MIN = 1e-3             # Minimum radius for correlation integral
 R_MAX = 1.0              # Maximum radius
 N_RADII = 50             # Number of radii to sample
 FIT_EXCLUDE = 10         # Exclude last N points from fit (avoid saturation)
+DENSE_N_RADII = 200      # Radii of the dense grid searched for the scaling region
 
 # Energy bins for stratified analysis (in GeV)
 ENERGY_BINS = [
@@ -45,6 +53,8 @@ N_BOOTSTRAP = 1000
 # Clustering parameters
 DBSCAN_EPS = 0.1
 DBSCAN_MIN_SAMPLES = 5
+EPS_SCAN = np.logspace(-2.5, -0.5, 21)   # Linking lengths for the single-linkage scan
+TAU_PREDICTED = 1 + 13 / 19              # τ = 1 + 1/D₂ with D₂ = 19/13 (verify_math.py)
 
 # ============================================================================
 # CORE FUNCTIONS
@@ -103,6 +113,29 @@ def calculate_correlation_dimension(events: np.ndarray,
     Returns:
         (D₂, std_error): Correlation dimension and standard error
     """
+    r_values, C_r = correlation_integral(events, sample_size, r_min, r_max, n_radii)
+    fit = fit_correlation_integrals(r_values, C_r, fit_exclude)
+    return fit['slope'][0], fit['std_error'][0]
+
+
+def correlation_integral(events: np.ndarray,
+                         sample_size: int = SAMPLE_SIZE,
+                         r_min: float = R_MIN,
+                         r_max: float = R_MAX,
+                         n_radii: int = N_RADII) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Correlation integral C(r) of a (subsampled) event set.
+
+    Args:
+        events: N×2 array of (log_E, cos_zenith) coordinates
+        sample_size: Number of events to subsample (for efficiency)
+        r_min: Minimum radius
+        r_max: Maximum radius
+        n_radii: Number of radii to sample
+
+    Returns:
+        (r_values, C_r)
+    """
     N = min(len(events), sample_size)
 
     # Subsample if necessary
@@ -119,18 +152,75 @@ def calculate_correlation_dimension(events: np.ndarray,
     r_values = np.logspace(np.log10(r_min), np.log10(r_max), n_radii)
     C_r = np.array([np.sum(distances < r) / N**2 for r in r_values])
 
+    return r_values, C_r
+
+
+def fit_correlation_integrals(r_values: np.ndarray, C_r: np.ndarray,
+                              fit_exclude: int = FIT_EXCLUDE) -> Dict[str, np.ndarray]:
+    """
+    Log-log fits of one or many correlation integrals in a single batch.
+
+    Args:
+        r_values: Radii (shared by all curves)
+        C_r: (n_radii,) or (n_curves, n_radii) correlation integrals
+        fit_exclude: Number of points to exclude from fit (avoid saturation)
+
+    Returns:
+        dict of (n_curves,) arrays: slope (D₂), intercept, std_error
+    """
     # Log-log fit (exclude saturation region)
     log_r = np.log(r_values[:-fit_exclude])
-    log_C = np.log(C_r[:-fit_exclude] + 1e-10)  # Avoid log(0)
+    log_C = np.log(np.atleast_2d(C_r)[:, :-fit_exclude] + 1e-10)  # Avoid log(0)
 
     # Linear regression: log C = D₂ × log r + const
-    coeffs, residuals, _, _, _ = np.polyfit(log_r, log_C, 1, full=True)
-    D2 = coeffs[0]
+    fit = batch_linear_fit(log_r, log_C)
 
     # Estimate error from residuals
-    std_error = np.sqrt(residuals[0] / (len(log_r) - 2)) if len(residuals) > 0 else 0.05
+    std_error = np.where(np.isfinite(fit['residual_std']), fit['residual_std'], 0.05)
+
+    return {'slope': fit['slope'], 'intercept': fit['intercept'], 'std_error': std_error}
 
-    return D2, std_error
+
+def correlation_integrals(events: np.ndarray,
+                          sample_size: int = SAMPLE_SIZE,
+                          r_min: float = R_MIN,
+                          r_max: float = R_MAX,
+                          n_radii: int = N_RADII,
+                          dense_n_radii: int = DENSE_N_RADII) -> Tuple[np.ndarray, ...]:
+    """
+    Correlation integrals of one subsample on the standard and the dense grid.
+
+    Both grids are counted in a single tiled pair pass (same definition as
+    correlation_integral, without the N×N matrix), so the fixed-window D₂
+    and the scaling region found by loglog_fit.scaling_region describe the
+    same events.
+
+    Args:
+        events: N×2 array of (log_E, cos_zenith) coordinates
+        sample_size: Number of events to subsample (for efficiency)
+        r_min: Minimum radius
+        r_max: Maximum radius
+        n_radii: Number of radii in the standard grid
+        dense_n_radii: Number of radii in the dense grid
+
+    Returns:
+        (r_values, C_r, r_dense, C_dense)
+    """
+    N = min(len(events), sample_size)
+    if len(events) > sample_size:
+        sample = events[np.random.choice(len(events), sample_size, replace=False)]
+    else:
+        sample = events
+
+    r_values = np.logspace(np.log10(r_min), np.log10(r_max), n_radii)
+    r_dense = np.logspace(np.log10(r_min), np.log10(r_max), dense_n_radii)
+    r_all, inverse = np.unique(np.concatenate([r_values, r_dense]), return_inverse=True)
+
+    # Ordered pairs plus the N self-pairs, as in correlation_integral
+    C_all = (2 * tiled_pair_counts(sample, r_all) + N) / N**2
+    C_all = C_all[inverse]
+
+    return r_values, C_all[:n_radii], r_dense, C_all[n_radii:]
 
 
 def calculate_d2_bootstrap(events: np.ndarray, n_bootstrap: int = N_BOOTSTRAP) -> Tuple[float, float]:
@@ -144,16 +234,18 @@ def calculate_d2_bootstrap(events: np.ndarray, n_bootstrap: int = N_BOOTSTRAP) -
     Returns:
         (mean_D₂, std_D₂): Mean and standard deviation over bootstrap samples
     """
-    d2_samples = []
+    curves = []
 
     for _ in range(n_bootstrap):
         # Resample with replacement
         indices = np.random.choice(len(events), len(events), replace=True)
         resampled = events[indices]
 
-        # Calculate D₂
-        d2, _ = calculate_correlation_dimension(resampled)
-        d2_samples.append(d2)
+        # Correlation integral; all replicates are fitted together below
+        r_values, C_r = correlation_integral(resampled)
+        curves.append(C_r)
+
+    d2_samples = fit_correlation_integrals(r_values, np.array(curves))['slope']
 
     return np.mean(d2_samples), np.std(d2_samples)
 
@@ -181,7 +273,7 @@ def energy_stratified_d2(data: pd.DataFrame, bins: List[Tuple]) -> pd.DataFrame:
             continue
 
         # Calculate D₂
-        events = subset[['Log_E', 'Cos_Zenith']].values
+        events = subset[FEATURE_COLUMNS].values
         d2, error = calculate_correlation_dimension(events)
 
         results.append({
@@ -212,26 +304,22 @@ def angular_correlation(data: pd.DataFrame) -> Tuple[float, float]:
     """
     zenith = data['Zenith'].values
 
-    # Compute pairwise angular differences
-    zenith_diff = np.abs(zenith[:, None] - zenith[None, :])
+    # Histogram of pairwise angular differences, restricted to small angles
+    # (< 10° ≈ 0.17 rad) to avoid large-scale structure. Counted from the
+    # sorted angles, without the N×N difference matrix.
+    counts, bin_edges = separation_histogram(zenith, bins=20, lower=1e-3, upper=0.17)
 
-    # Select small angles (< 10° ≈ 0.17 rad) to avoid large-scale structure
-    theta_small = zenith_diff[(zenith_diff > 1e-3) & (zenith_diff < 0.17)]
-
-    if len(theta_small) < 10:
+    if counts.sum() < 10:
         print("Warning: Insufficient small-angle pairs")
         return np.nan, np.nan
 
-    # Histogram of angles
-    counts, bin_edges = np.histogram(theta_small, bins=20)
     bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
 
     # Power-law fit: log(counts) = -α × log(θ) + const
     log_theta = np.log10(bin_centers)
     log_counts = np.log10(counts + 1)
 
-    coeffs = np.polyfit(log_theta, log_counts, 1)
-    slope = -coeffs[0]  # Negative because counts decay
+    slope = -batch_linear_fit(log_theta, log_counts)['slope'][0]  # Negative because counts decay
 
     # Crude error estimate
     error = 0.05
@@ -244,6 +332,10 @@ def cluster_analysis(events: np.ndarray, eps: float = DBSCAN_EPS,
     """
     Perform DBSCAN clustering to identify event clusters.
 
+    Uses the grid-hashed DBSCAN from grid_dbscan.py, which gives the same
+    labels as sklearn's DBSCAN in close to linear time, so the full catalog
+    can be clustered.
+
     Args:
         events: N×2 array
         eps: DBSCAN neighborhood radius
@@ -252,17 +344,33 @@ def cluster_analysis(events: np.ndarray, eps: float = DBSCAN_EPS,
     Returns:
         (n_clusters, cluster_sizes): Number of clusters and size distribution
     """
-    db = DBSCAN(eps=eps, min_samples=min_samples).fit(events)
-    labels = db.labels_
+    labels, _ = grid_dbscan(events, eps, min_samples)
 
-    # Count clusters (excluding noise label -1)
-    unique_labels = set(labels)
-    n_clusters = len(unique_labels) - (1 if -1 in unique_labels else 0)
+    # Count clusters (excluding noise label -1) and their sizes
+    clusters = summarize_clusters(labels)
 
-    # Cluster size distribution
-    cluster_sizes = [np.sum(labels == label) for label in unique_labels if label != -1]
+    return clusters['n_clusters'], clusters['sizes']
 
-    return n_clusters, np.array(cluster_sizes)
+
+def cluster_count_vs_eps(events: np.ndarray, eps_values: np.ndarray = EPS_SCAN,
+                         min_size: int = DBSCAN_MIN_SAMPLES) -> pd.DataFrame:
+    """
+    Single-linkage cluster count, sizes and size exponent τ for every eps.
+
+    The Euclidean minimum spanning tree is built once and cut at each eps,
+    so the whole count-versus-scale curve costs one clustering.
+
+    Args:
+        events: N×2 array
+        eps_values: Linking lengths
+        min_size: Smallest cluster counted
+
+    Returns:
+        DataFrame with columns: eps, n_clusters, mean_size, max_size,
+        noise_fraction, tau, tau_error
+    """
+    scan = cluster_scan(events, eps_values, min_size)
+    return pd.DataFrame({key: value for key, value in scan.items() if key != 'sizes'})
 
 
 # ============================================================================
@@ -284,22 +392,15 @@ def plot_event_distribution(data: pd.DataFrame, output_file: str = 'icecube_dist
 
 def plot_correlation_integral(events: np.ndarray, output_file: str = 'correlation_integral.png'):
     """Plot correlation integral C(r) vs r."""
-    N = min(len(events), SAMPLE_SIZE)
-    sample = events[np.random.choice(len(events), N, replace=False)] if len(events) > N else events
-
-    distances = cdist(sample, sample, metric='euclidean')
-    r_values = np.logspace(np.log10(R_MIN), np.log10(R_MAX), N_RADII)
-    C_r = np.array([np.sum(distances < r) / N**2 for r in r_values])
+    r_values, C_r = correlation_integral(events)
 
     # Fit
-    log_r = np.log(r_values[:-FIT_EXCLUDE])
-    log_C = np.log(C_r[:-FIT_EXCLUDE] + 1e-10)
-    coeffs = np.polyfit(log_r, log_C, 1)
-    D2 = coeffs[0]
+    fit = fit_correlation_integrals(r_values, C_r)
+    D2 = fit['slope'][0]
 
     plt.figure(figsize=(10, 7))
     plt.loglog(r_values, C_r, 'o', label='Data', markersize=4)
-    plt.loglog(r_values[:-FIT_EXCLUDE], np.exp(coeffs[1]) * r_values[:-FIT_EXCLUDE]**D2,
+    plt.loglog(r_values[:-FIT_EXCLUDE], np.exp(fit['intercept'][0]) * r_values[:-FIT_EXCLUDE]**D2,
                'r--', label=f'Fit: D₂ = {D2:.2f}')
     plt.xlabel('Radius r')
     plt.ylabel('Correlation Integral C(r)')
@@ -327,17 +428,27 @@ def main():
     # Load data
     print("Loading data...")
     data = load_icecube_data(DATA_FILE)
-    events = data[['Log_E', 'Cos_Zenith']].values
+    events = data[FEATURE_COLUMNS].values
     print()
 
     # Primary D₂ calculation
     print("Calculating total D₂...")
-    D2, D2_error = calculate_correlation_dimension(events)
+    r_values, C_r, r_dense, C_dense = correlation_integrals(events)
+    fit = fit_correlation_integrals(r_values, C_r)
+    D2, D2_error = fit['slope'][0], fit['std_error'][0]
     print(f"Total D₂ = {D2:.2f} ± {D2_error:.2f}")
     print(f"DFA Prediction: D₂ = 1.45 ± 0.10")
     print(f"Difference: {abs(D2 - 1.45):.2f} ({abs(D2 - 1.45) / 0.10:.1f}σ)")
     print()
 
+    # Scaling region from the data instead of FIT_EXCLUDE (same sample)
+    print("Detecting scaling region...")
+    region = scaling_region(r_dense, C_dense)
+    print(f"Scaling region: r = {region['r_min']:.4f} - {region['r_max']:.4f} "
+          f"({region['n_points']} of {DENSE_N_RADII} radii, RMS {region['rms']:.3f})")
+    print(f"D₂ over scaling region = {region['D2']:.2f} ± {region['error']:.2f}")
+    print()
+
     # Energy-stratified D₂
     print("Energy-stratified analysis...")
     stratified_results = energy_stratified_d2(data, ENERGY_BINS)
@@ -358,6 +469,17 @@ def main():
     print(f"Mean cluster size: {np.mean(cluster_sizes):.1f}")
     print()
 
+    # Cluster count and size exponent across linking lengths
+    print("Single-linkage scan over eps...")
+    scan = cluster_count_vs_eps(events)
+    print(f"  {'eps':>8s}  {'clusters':>8s}  {'mean size':>9s}  {'τ':>13s}")
+    for row in scan.itertuples():
+        print(f"  {row.eps:8.4f}  {row.n_clusters:8d}  {row.mean_size:9.1f}  "
+              f"{row.tau:6.3f} ± {row.tau_error:.3f}")
+    print(f"Measured 1 + 1/D₂ = {1 + 1 / D2:.3f}")
+    print(f"DFA Prediction: τ = 1 + 1/D₂ = {TAU_PREDICTED:.3f}")
+    print()
+
     # Visualization
     print("Generating plots...")
     plot_event_distribution(data)
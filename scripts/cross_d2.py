@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Cross-Correlation Dimension Between Neutrino Catalogs
+
+The repo measures D₂ of each catalog on its own: HESE (verify_d2_hese.py),
+the 10-year point-source sample (analyze_10yr_d2.py), and the generic
+DATA_FILE of calculate_d2.py; the AMANDA-II 7-year events in data/ are not
+analysed at all. This compares catalogs through the cross-correlation
+integral
+
+    C_AB(r) = #{(a, b) ∈ A × B : |a - b| < r} / (N_A N_B)
+
+whose log-log slope is the cross-correlation dimension D_AB. Pairs are
+counted by dual-tree traversal (pair_counts.tree_pair_counts with the two
+catalogs as query and reference sets), so catalogs are never concatenated
+and no N_A × N_B matrix is formed. The tree counts d <= r, so it is queried
+at the next float below each radius to keep the d < r convention of the
+other D₂ scripts.
+
+Catalogs are compared in a space they share:
+
+    energy_zenith   [log10 E, cos zenith], both scaled to [0, 1] over the
+                    union of the two catalogs (HESE, 10-year, DATA_FILE)
+    sky             unit vectors of (RA, Dec) (10-year, AMANDA)
+
+AMANDA records Nch rather than an energy, so it only enters the sky space.
+
+Usage:
+    python cross_d2.py [events_dir]
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Tuple
+import json
+import sys
+import zipfile
+
+from angular_correlation_sky import unit_vectors
+from loglog_fit import correlation_slopes
+from pair_counts import tree_pair_counts
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HESE_FILE = 'data/HESE-7-year-data-release-main/HESE-7-year-data-release/resources/data/HESE_data.json'
+AMANDA_FILE = 'data/20080911_AMANDA_7_Year_Data.zip'
+AMANDA_COLUMNS = ['Dec', 'RA_h', 'Nch', 'Resol', 'Year', 'Day', 'Second', 'MJD']
+EVENTS_DIR = 'events'
+DATA_FILE = 'data.dat'
+
+SPACES = {
+    'energy_zenith': ['log10E', 'cos_zenith'],
+    'sky': ['ra', 'dec'],
+}
+
+MAX_EVENTS = 50_000        # Per catalog; larger catalogs are subsampled
+N_RADII = 30
+N_RANDOM_PAIRS = 1_000_000
+SEED = 42
+
+# ============================================================================
+# CATALOGS
+# ============================================================================
+
+def load_hese(path: str = HESE_FILE) -> pd.DataFrame:
+    """HESE 7.5-year events: log10E, cos_zenith"""
+    with open(path) as f:
+        data = json.load(f)
+    return pd.DataFrame({'log10E': np.log10(np.array(data['recoDepositedEnergy'])),
+                         'cos_zenith': np.cos(np.array(data['recoZenith']))})
+
+
+def load_10yr(events_dir: str = EVENTS_DIR) -> pd.DataFrame:
+    """10-year point-source events: log10E, cos_zenith, ra, dec"""
+    from analyze_10yr_d2 import load_all_events
+
+    df = load_all_events(events_dir)
+    return pd.DataFrame({'log10E': df['log10E'].values,
+                         'cos_zenith': np.cos(np.radians(df['Zenith'].values)),
+                         'ra': df['RA'].values, 'dec': df['Dec'].values})
+
+
+def load_amanda(path: str = AMANDA_FILE) -> pd.DataFrame:
+    """
+    AMANDA-II 7-year events: ra, dec (degrees), nch, resol, mjd, atm_subset.
+
+    The zip holds one whitespace-separated text file; rows flagged 'X' in
+    the last column belong to the atmospheric-neutrino analysis subset.
+    """
+    with zipfile.ZipFile(path) as z:
+        name = next(n for n in z.namelist() if n.endswith('.txt') and not n.startswith('__MACOSX'))
+        lines = z.read(name).decode().splitlines()
+
+    rows, subset = [], []
+    for line in lines:
+        fields = line.split()
+        if len(fields) < len(AMANDA_COLUMNS) or line.lstrip().startswith(('#', '-', 'Dec')):
+            continue
+        rows.append([float(x) for x in fields[:len(AMANDA_COLUMNS)]])
+        subset.append(len(fields) > len(AMANDA_COLUMNS))
+
+    raw = pd.DataFrame(rows, columns=AMANDA_COLUMNS)
+    return pd.DataFrame({'ra': raw['RA_h'].values * 15.0, 'dec': raw['Dec'].values,
+                         'nch': raw['Nch'].values, 'resol': raw['Resol'].values,
+                         'mjd': raw['MJD'].values, 'atm_subset': np.array(subset)})
+
+
+def load_data_file(path: str = DATA_FILE) -> pd.DataFrame:
+    """calculate_d2.py DATA_FILE (Energy in GeV, Zenith in radians): log10E, cos_zenith"""
+    from calculate_d2 import load_icecube_data
+
+    data = load_icecube_data(path)
+    return pd.DataFrame({'log10E': data['Log_E'].values, 'cos_zenith': data['Cos_Zenith'].values})
+
+
+def load_catalogs(events_dir: str = EVENTS_DIR) -> Dict[str, pd.DataFrame]:
+    """Every catalog whose data is present (missing ones are reported and skipped)"""
+    sources = {
+        'HESE': (HESE_FILE, load_hese),
+        '10yr': (events_dir, load_10yr),
+        'AMANDA': (AMANDA_FILE, load_amanda),
+        'DATA_FILE': (DATA_FILE, load_data_file),
+    }
+    catalogs = {}
+    for name, (path, loader) in sources.items():
+        if not Path(path).exists():
+            print(f"  {name}: {path} not found, skipped")
+            continue
+        catalogs[name] = loader(path)
+        print(f"  {name}: {len(catalogs[name]):,} events")
+    return catalogs
+
+# ============================================================================
+# CROSS-CORRELATION
+# ============================================================================
+
+def embed_pair(a: pd.DataFrame, b: pd.DataFrame, space: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Points of two catalogs in one shared space"""
+    if space == 'sky':
+        return unit_vectors(a['ra'].values, a['dec'].values), unit_vectors(b['ra'].values, b['dec'].values)
+    columns = SPACES[space]
+    A, B = a[columns].values.astype(float), b[columns].values.astype(float)
+    lo = np.minimum(A.min(axis=0), B.min(axis=0))
+    hi = np.maximum(A.max(axis=0), B.max(axis=0))
+    return (A - lo) / (hi - lo), (B - lo) / (hi - lo)
+
+
+def cross_radius_range(A: np.ndarray, B: np.ndarray, n_pairs: int = N_RANDOM_PAIRS,
+                       seed: int = SEED) -> Tuple[float, float]:
+    """5th percentile of non-zero and 95th percentile of all A×B distances, from random pairs"""
+    rng = np.random.default_rng(seed)
+    d = np.sqrt(np.sum((A[rng.integers(0, len(A), n_pairs)] - B[rng.integers(0, len(B), n_pairs)]) ** 2,
+                       axis=1))
+    return np.percentile(d[d > 0], 5), np.percentile(d, 95)
+
+
+def cross_correlation_sum(A: np.ndarray, B: np.ndarray, radii: np.ndarray,
+                          auto: bool = False) -> np.ndarray:
+    """C_AB(r) from dual-tree counts of A against B (self-pairs removed if auto)"""
+    counts = tree_pair_counts(A, B, np.nextafter(radii, 0))
+    if auto:
+        return (counts - len(A)) / (len(A) * (len(A) - 1))
+    return counts / (len(A) * len(B))
+
+
+def cross_dimension(A: np.ndarray, B: np.ndarray, n_radii: int = N_RADII,
+                    auto: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Cross-correlation dimension D_AB of two point sets.
+
+    With auto (B is A) this is the ordinary correlation dimension.
+
+    Returns:
+        dict with r, C (C_AB(r)), D2, error (slope over 0.01 < C < 0.99)
+    """
+    d_min, d_max = cross_radius_range(A, B)
+    radii = np.logspace(np.log10(d_min), np.log10(d_max), n_radii)
+    C = cross_correlation_sum(A, B, radii, auto)
+
+    d2, err = correlation_slopes(radii, C)
+    return {'r': radii, 'C': C, 'D2': d2[0], 'error': err[0]}
+
+
+def main():
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else EVENTS_DIR
+
+    print("=" * 70)
+    print("CROSS-CORRELATION DIMENSION BETWEEN CATALOGS")
+    print("=" * 70)
+    print()
+
+    print("Catalogs:")
+    catalogs = load_catalogs(events_dir)
+    for name, df in catalogs.items():
+        if len(df) > MAX_EVENTS:
+            catalogs[name] = df.sample(n=MAX_EVENTS, random_state=SEED)
+            print(f"  {name}: sampled {MAX_EVENTS:,} events")
+    print()
+
+    rows = []
+    names = list(catalogs)
+    for space, columns in SPACES.items():
+        members = [n for n in names if all(c in catalogs[n].columns for c in columns)]
+        print(f"{space} space ({', '.join(members) if members else 'no catalogs'}):")
+        for i, name_a in enumerate(members):
+            for name_b in members[i:]:
+                A, B = embed_pair(catalogs[name_a], catalogs[name_b], space)
+                result = cross_dimension(A, B, auto=name_a == name_b)
+                print(f"  {name_a:>9s} x {name_b:<9s} D = {result['D2']:.3f} +/- {result['error']:.3f}")
+                rows.append({'space': space, 'A': name_a, 'B': name_b, 'N_A': len(A), 'N_B': len(B),
+                             'D2': result['D2'], 'error': result['error']})
+        print()
+
+    pd.DataFrame(rows).to_csv('cross_d2.csv', index=False)
+    print("✓ Saved: cross_d2.csv")
+
+
+if __name__ == '__main__':
+    main()
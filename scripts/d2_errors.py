@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Analytic D₂ Errors from the Pair-Count Covariance
+
+D₂ errors in the repo come from the regression residuals (std_error in
+calculate_correlation_dimension, cov[0, 0] in grassberger_procaccia) or from
+bootstraps. The residual errors assume independent points, but C(r) is
+cumulative, so neighbouring radii share almost all of their pairs and the
+residuals understate the error. Bootstraps are honest but recount every pair
+for every replicate.
+
+C(r) is a U-statistic of order 2 with kernel h_r(x, y) = [|x - y| < r].
+By the Hoeffding decomposition its covariance across radii is
+
+    Cov(C_r, C_s) = [4 (N - 2) ζ1(r, s) + 2 ζ2(r, s)] / (N (N - 1))
+
+    ζ1(r, s) = Cov(g_r(X), g_s(X)),   g_r(x) = P(|x - Y| < r)
+    ζ2(r, s) = C_min(r,s) - C_r C_s   (since h_r h_s = h_min(r,s))
+
+g_r(x_i) is estimated from the neighbour count of point i, n_i(r) / (N - 1),
+which the pair pass collects at no extra asymptotic cost
+(pair_counts.tiled_point_counts); ζ1 is corrected for the binomial noise of
+those counts. The covariance is propagated to log C by the delta method, and
+D₂ is fitted over the usual 0.01 < C < 0.99 region by generalised least
+squares (loglog_fit.gls_linear_fit). When the points are not consistent
+with a straight line (χ²/dof > 1, i.e. log C is curved), the GLS error is
+scaled by sqrt(χ²/dof), as in the PDG averaging procedure. The ordinary slope
+is also reported with its sandwich error, which uses the same covariance.
+
+Usage:
+    python d2_errors.py [events_dir] [n_bootstrap]
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from typing import Dict
+import sys
+
+from feature_embeddings import BASELINE_SPEC, N_RADII, SEED, TILED_MAX_POINTS, embed, feature_table, radius_range
+from loglog_fit import C_MAX, C_MIN, MIN_POINTS, batch_linear_fit, gls_linear_fit, ols_sandwich_error
+from pair_counts import tiled_point_counts
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SAMPLE_SIZE = 5000
+N_BOOTSTRAP = 50           # Replicates for the comparison in main
+
+# ============================================================================
+# U-STATISTIC COVARIANCE
+# ============================================================================
+
+def point_counts(X: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    (N, R) neighbour counts of every point at every radius.
+
+    Tiled exact counts up to TILED_MAX_POINTS, KD-tree ball counts above;
+    both count d < r (the ball query, which counts d <= r, is run at the
+    next float below r).
+    """
+    if len(X) <= TILED_MAX_POINTS:
+        return tiled_point_counts(X, radii)
+    tree = cKDTree(X)
+    return np.column_stack([tree.query_ball_point(X, np.nextafter(r, 0), return_length=True) - 1
+                            for r in radii])
+
+
+def correlation_sum_covariance(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    C(r) and its covariance across radii from per-point neighbour counts.
+
+    Args:
+        counts: (N, R) neighbour counts (self excluded), cumulative in r
+
+    Returns:
+        dict with C (R,) and cov (R, R)
+    """
+    n = len(counts)
+    g = counts / (n - 1)
+    C = g.mean(axis=0)
+    C_min = C[np.minimum.outer(np.arange(len(C)), np.arange(len(C)))]
+
+    # E[ĝ_r ĝ_s] = ((N - 2) E[g_r g_s] + C_min(r,s)) / (N - 1): remove the
+    # binomial noise of the per-point counts before taking ζ1
+    products = g.T @ g / n
+    zeta1 = ((n - 1) * products - C_min) / (n - 2) - np.outer(C, C)
+    zeta2 = C_min - np.outer(C, C)
+    cov = (4 * (n - 2) * zeta1 + 2 * zeta2) / (n * (n - 1))
+    return {'C': C, 'cov': cov}
+
+
+def analytic_d2(X: np.ndarray, n_radii: int = N_RADII) -> Dict[str, float]:
+    """
+    D₂ with residual, sandwich and GLS errors from one pair pass.
+
+    Returns:
+        dict with D2 (ordinary fit), error_residual (as grassberger_procaccia),
+        error_sandwich, D2_gls, error_gls (scaled), chi2_gls, n_points
+    """
+    d_min, d_max = radius_range(X)
+    radii = np.logspace(np.log10(d_min), np.log10(d_max), n_radii)
+    moments = correlation_sum_covariance(point_counts(X, radii))
+    C, cov = moments['C'], moments['cov']
+
+    valid = (C > C_MIN) & (C < C_MAX)
+    result = {'D2': np.nan, 'error_residual': np.nan, 'error_sandwich': np.nan,
+              'D2_gls': np.nan, 'error_gls': np.nan, 'chi2_gls': np.nan, 'n_points': int(np.sum(valid))}
+    if np.sum(valid) < MIN_POINTS:
+        return result
+
+    log_r, log_C = np.log(radii[valid]), np.log(C[valid])
+    log_cov = cov[np.ix_(valid, valid)] / np.outer(C[valid], C[valid])
+
+    ols = batch_linear_fit(log_r, log_C)
+    gls = gls_linear_fit(log_r, log_C, log_cov)
+    scale = np.sqrt(max(1.0, gls['chi2'] / (len(log_r) - 2)))
+    result.update({'D2': ols['slope'][0], 'error_residual': ols['slope_error'][0],
+                   'error_sandwich': ols_sandwich_error(log_r, log_cov),
+                   'D2_gls': gls['slope'], 'error_gls': scale * gls['slope_error'], 'chi2_gls': gls['chi2']})
+    return result
+
+
+def main():
+    from analyze_10yr_d2 import bootstrap_d2, load_all_events
+
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else 'events'
+    n_bootstrap = int(sys.argv[2]) if len(sys.argv) > 2 else N_BOOTSTRAP
+
+    print("=" * 70)
+    print("ANALYTIC D2 ERRORS: U-Statistic Covariance of C(r)")
+    print("=" * 70)
+    print()
+
+    df = load_all_events(events_dir)
+    sample = df.sample(n=SAMPLE_SIZE, random_state=SEED) if len(df) > SAMPLE_SIZE else df
+    X = embed(feature_table(sample, [BASELINE_SPEC]), BASELINE_SPEC)
+    print(f"\nSample: {len(X):,} events, [log10(E), sin(Dec)]")
+    print()
+
+    result = analytic_d2(X)
+    print(f"Ordinary fit:  D2 = {result['D2']:.3f}")
+    print(f"  residual error (independent points): {result['error_residual']:.4f}")
+    print(f"  sandwich error (pair covariance):    {result['error_sandwich']:.4f}")
+    print(f"GLS fit:       D2 = {result['D2_gls']:.3f} +/- {result['error_gls']:.4f} "
+          f"(chi2 = {result['chi2_gls']:.1f} for {result['n_points'] - 2} dof)")
+
+    if n_bootstrap > 0:
+        print(f"\nBootstrap comparison ({n_bootstrap} replicates)...")
+        np.random.seed(SEED)
+        d2_mean, d2_std = bootstrap_d2(X, n_bootstrap=n_bootstrap)
+        result.update({'D2_bootstrap': d2_mean, 'error_bootstrap': d2_std})
+        print(f"Bootstrap:     D2 = {d2_mean:.3f} +/- {d2_std:.4f}")
+
+    pd.DataFrame([result]).to_csv('d2_errors.csv', index=False)
+    print("\n✓ Saved: d2_errors.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+IceCube 10-Year Event Store
+
+Parsing the whitespace-separated season files with load_all_events takes
+longer than most of the analyses run on them. This writes every event column
+once as a memory-mapped .npy array, with rows grouped by season, plus a small
+JSON index:
+
+    event_store/
+        index.json          per-season row ranges and MJD span
+        MJD.npy, log10E.npy, AngErr.npy, RA.npy, Dec.npy, Azimuth.npy, Zenith.npy
+
+Analyses open the store with open_events(), and per-season code reads only
+its own rows (season_rows), so worker processes can map the arrays
+themselves instead of being sent the data.
+
+Usage:
+    python event_store.py [events_dir] [store_dir]
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict
+import json
+import sys
+
+from analyze_10yr_d2 import load_all_events
+
+# Default locations
+EVENTS_DIR = 'events'
+STORE_DIR = 'event_store'
+INDEX_FILE = 'index.json'
+
+COLUMNS = ['MJD', 'log10E', 'AngErr', 'RA', 'Dec', 'Azimuth', 'Zenith']
+
+
+def load_index(store_dir: str = STORE_DIR) -> Dict:
+    """Load the store index (empty dict if nothing has been ingested)"""
+    path = Path(store_dir) / INDEX_FILE
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def ingest_events(events_dir: str = EVENTS_DIR, store_dir: str = STORE_DIR) -> Dict:
+    """
+    Parse the season files once and write the column arrays.
+
+    Seasons are stored in order of their first arrival time.
+
+    Returns:
+        Index (dict with 'n_events' and the list of 'seasons')
+    """
+    Path(store_dir).mkdir(parents=True, exist_ok=True)
+    df = load_all_events(events_dir)
+
+    start_mjd = df.groupby('season', sort=False)['MJD'].min().sort_values()
+    df['season'] = pd.Categorical(df['season'], categories=list(start_mjd.index), ordered=True)
+    df = df.sort_values('season', kind='stable')
+
+    for column in COLUMNS:
+        np.save(Path(store_dir) / f"{column}.npy", df[column].values.astype(np.float64))
+
+    seasons = []
+    start = 0
+    for season, group in df.groupby('season', sort=True, observed=True):
+        stop = start + len(group)
+        seasons.append({'season': str(season), 'start': start, 'stop': stop,
+                        'mjd_start': float(group['MJD'].min()), 'mjd_end': float(group['MJD'].max())})
+        start = stop
+
+    index = {'n_events': len(df), 'seasons': seasons}
+    with open(Path(store_dir) / INDEX_FILE, 'w') as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+def open_events(store_dir: str = STORE_DIR) -> Dict[str, np.ndarray]:
+    """Memory-map every column of the store (read-only)"""
+    return {column: np.load(Path(store_dir) / f"{column}.npy", mmap_mode='r') for column in COLUMNS}
+
+
+def season_rows(store_dir: str = STORE_DIR, start: int = 0, stop: int = None) -> pd.DataFrame:
+    """
+    Events in rows [start, stop) of the store as a DataFrame.
+
+    Takes a row range from the index so only those rows are read.
+    """
+    columns = open_events(store_dir)
+    return pd.DataFrame({column: np.array(values[start:stop]) for column, values in columns.items()})
+
+
+def main():
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else EVENTS_DIR
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+
+    print("=" * 70)
+    print("IceCube Event Store Ingestion")
+    print("=" * 70)
+    print(f"Reading season files from: {events_dir}")
+    print(f"Writing column arrays to: {store_dir}")
+    print()
+
+    index = ingest_events(events_dir, store_dir)
+
+    print()
+    for entry in index['seasons']:
+        print(f"  {entry['season']:12s} rows {entry['start']:>9,}-{entry['stop']:<9,} "
+              f"MJD {entry['mjd_start']:.1f}-{entry['mjd_end']:.1f}")
+    print(f"\nStore now holds {index['n_events']:,} events")
+    print(f"Index: {Path(store_dir) / INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
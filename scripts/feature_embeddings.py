@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Configurable Feature Embeddings for D₂
+
+prepare_features in analyze_10yr_d2.py always embeds events as
+[log10 E, sin Dec]. Here an embedding is described by a feature spec, a list
+of (feature, scaling) or (feature, scaling, weight) entries:
+
+    [('log10E', 'minmax'), ('sin_dec', 'minmax'), ('mjd', 'minmax', 0.5)]
+
+Features are derived from the 10-year event columns (FEATURES below).
+Scalings are 'minmax' (to [0, 1], as prepare_features does), 'zscore' or
+'none'; the optional weight multiplies the scaled feature.
+
+Several specs are evaluated against one loaded catalog: the subsample is
+drawn once, each derived feature is computed once and its scaling statistics
+are shared by every spec that uses it. Correlation sums go through the pair
+counters in pair_counts.py (exact row-tiled counts for small samples, KD-tree
+counts for large ones), so 3-5-D embeddings never form a pair matrix.
+
+Usage:
+    python feature_embeddings.py [events_dir] [sample_size]
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence, Tuple
+import sys
+
+from loglog_fit import correlation_slopes
+from pair_counts import smoothed_pair_counts, tiled_pair_counts, tree_pair_counts
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+FEATURES = {
+    'log10E': lambda df: df['log10E'].values,
+    'sin_dec': lambda df: np.sin(np.radians(df['Dec'].values)),
+    'ra': lambda df: df['RA'].values,
+    'mjd': lambda df: df['MJD'].values,
+    'ang_err': lambda df: df['AngErr'].values,
+    'azimuth': lambda df: df['Azimuth'].values,
+    'cos_zenith': lambda df: np.cos(np.radians(df['Zenith'].values)),
+}
+
+BASELINE_SPEC = [('log10E', 'minmax'), ('sin_dec', 'minmax')]
+
+FEATURE_SPECS = {
+    'log10E, sin Dec': BASELINE_SPEC,
+    'log10E, sin Dec, RA': BASELINE_SPEC + [('ra', 'minmax')],
+    'log10E, sin Dec, MJD': BASELINE_SPEC + [('mjd', 'minmax')],
+    'log10E, sin Dec, AngErr': BASELINE_SPEC + [('ang_err', 'minmax')],
+    'log10E, sin Dec, RA, MJD': BASELINE_SPEC + [('ra', 'minmax'), ('mjd', 'minmax')],
+    'log10E, sin Dec, RA, MJD, AngErr': BASELINE_SPEC + [('ra', 'minmax'), ('mjd', 'minmax'),
+                                                         ('ang_err', 'minmax')],
+    'log10E, cos Zen, azimuth': [('log10E', 'minmax'), ('cos_zenith', 'minmax'), ('azimuth', 'minmax')],
+}
+
+SAMPLE_SIZE = 10000
+TILED_MAX_POINTS = 20000     # Exact tiled counts up to this size, KD-tree counts above
+N_RADII = 30
+N_RANDOM_PAIRS = 1_000_000   # Random pairs used to set the radius range
+SEED = 42
+
+# ============================================================================
+# SHARED PREPROCESSING
+# ============================================================================
+
+def _entries(spec: Sequence) -> List[Tuple[str, str, float]]:
+    """Normalise spec entries to (feature, scaling, weight)"""
+    entries = []
+    for entry in spec:
+        if isinstance(entry, str):
+            entry = (entry, 'minmax')
+        name, scaling = entry[0], entry[1]
+        weight = float(entry[2]) if len(entry) > 2 else 1.0
+        if name not in FEATURES:
+            raise ValueError(f"Unknown feature: {name}")
+        if scaling not in ('minmax', 'zscore', 'none'):
+            raise ValueError(f"Unknown scaling: {scaling}")
+        entries.append((name, scaling, weight))
+    return entries
+
+
+def feature_table(df: pd.DataFrame, specs: Sequence[Sequence] = (BASELINE_SPEC,)) -> Dict[str, Dict]:
+    """
+    Derive every feature used by the specs once, with its scaling statistics.
+
+    Returns:
+        feature name -> dict with values, min, max, mean, std
+    """
+    names = sorted({name for spec in specs for name, _, _ in _entries(spec)})
+    table = {}
+    for name in names:
+        values = np.asarray(FEATURES[name](df), dtype=float)
+        table[name] = {'values': values, 'min': values.min(), 'max': values.max(),
+                       'mean': values.mean(), 'std': values.std()}
+    return table
+
+
+def embed(table: Dict[str, Dict], spec: Sequence) -> np.ndarray:
+    """(N, d) embedding of the events in a feature table for one spec"""
+    columns = []
+    for name, scaling, weight in _entries(spec):
+        f = table[name]
+        if scaling == 'minmax':
+            column = (f['values'] - f['min']) / (f['max'] - f['min'])
+        elif scaling == 'zscore':
+            column = (f['values'] - f['mean']) / f['std']
+        else:
+            column = f['values']
+        columns.append(weight * column)
+    return np.column_stack(columns)
+
+# ============================================================================
+# CORRELATION DIMENSION
+# ============================================================================
+
+def radius_range(X: np.ndarray, n_pairs: int = N_RANDOM_PAIRS, seed: int = SEED) -> Tuple[float, float]:
+    """5th percentile of non-zero and 95th percentile of all pair distances, from random pairs"""
+    rng = np.random.default_rng(seed)
+    i = rng.integers(0, len(X), n_pairs)
+    j = rng.integers(0, len(X), n_pairs)
+    keep = i != j
+    d = np.sqrt(np.sum((X[i[keep]] - X[j[keep]]) ** 2, axis=1))
+    return np.percentile(d[d > 0], 5), np.percentile(d, 95)
+
+
+def correlation_sum(X: np.ndarray, radii: np.ndarray, weights: np.ndarray = None,
+                    sigma: np.ndarray = None) -> np.ndarray:
+    """
+    C(r) = 2 × #pairs / (N (N - 1)) with d < r, from tiled counts or, above
+    TILED_MAX_POINTS, KD-tree counts (which count d <= r and are therefore
+    run at the next float below each radius).
+
+    With weights, each pair counts w_i w_j and C(r) is normalised by the
+    total pair weight. With sigma (per-point uncertainty in the units of X),
+    pairs are kernel-smoothed (pair_counts.smoothed_pair_counts, tiled only).
+    """
+    n = len(X)
+    if weights is None:
+        total = n * (n - 1) / 2
+    else:
+        weights = np.asarray(weights, dtype=float)
+        total = (np.sum(weights) ** 2 - np.sum(weights ** 2)) / 2
+
+    if sigma is not None:
+        pairs = smoothed_pair_counts(X, sigma, radii, weights=weights)
+    elif n <= TILED_MAX_POINTS:
+        pairs = tiled_pair_counts(X, radii, weights=weights)
+    else:
+        self_pairs = n if weights is None else np.sum(weights ** 2)
+        pairs = (tree_pair_counts(X, X, np.nextafter(radii, 0), weights=weights) - self_pairs) / 2
+    return pairs / total
+
+
+def correlation_dimension(X: np.ndarray, n_radii: int = N_RADII, weights: np.ndarray = None,
+                          sigma: np.ndarray = None) -> Tuple[float, float]:
+    """Grassberger-Procaccia D₂ with the scaling region of analyze_10yr_d2.py"""
+    d_min, d_max = radius_range(X)
+    radii = np.logspace(np.log10(d_min), np.log10(d_max), n_radii)
+    C_r = correlation_sum(X, radii, weights, sigma)
+
+    d2, err = correlation_slopes(radii, C_r)
+    return d2[0], err[0]
+
+
+def evaluate_specs(df: pd.DataFrame, specs: Dict[str, Sequence] = FEATURE_SPECS,
+                   sample_size: int = SAMPLE_SIZE, seed: int = SEED) -> pd.DataFrame:
+    """
+    D₂ of one catalog under several feature specs.
+
+    The same event subsample and feature table are shared by all specs.
+
+    Returns:
+        DataFrame with columns: spec, dims, D2, error, N
+    """
+    sample = df.sample(n=sample_size, random_state=seed) if len(df) > sample_size else df
+    table = feature_table(sample, specs.values())
+
+    rows = []
+    for label, spec in specs.items():
+        X = embed(table, spec)
+        d2, err = correlation_dimension(X)
+        rows.append({'spec': label, 'dims': X.shape[1], 'D2': d2, 'error': err, 'N': len(X)})
+        print(f"  {label:36s} ({X.shape[1]}-D): D2 = {d2:.3f} +/- {err:.3f}")
+    return pd.DataFrame(rows)
+
+
+def main():
+    from analyze_10yr_d2 import load_all_events
+
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else 'events'
+    sample_size = int(sys.argv[2]) if len(sys.argv) > 2 else SAMPLE_SIZE
+
+    print("=" * 70)
+    print("D2 UNDER MULTI-FEATURE EMBEDDINGS")
+    print("=" * 70)
+    print()
+
+    df = load_all_events(events_dir)
+    print(f"\nEvaluating {len(FEATURE_SPECS)} feature specs on {min(sample_size, len(df)):,} events")
+    results = evaluate_specs(df, FEATURE_SPECS, sample_size)
+
+    results.to_csv('feature_embedding_d2.csv', index=False)
+    print("\n✓ Saved: feature_embedding_d2.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Grid-Accelerated DBSCAN
+
+Same labels as sklearn.cluster.DBSCAN(eps, min_samples) with the Euclidean
+metric, for the low-dimensional event spaces of calculate_d2.py, without a
+neighbourhood query per point.
+
+Points are hashed into cells of side eps/√d, so any two points in one cell
+are within eps of each other:
+
+    1. Every point of a cell holding >= min_samples points is a core point.
+       Only points of sparser cells need an explicit neighbour count.
+    2. All core points of a cell belong to one cluster, so clusters are
+       formed by merging cells. Two neighbouring cells (those whose closest
+       points can be within eps) are merged with union-find when their
+       closest pair of core points is within eps. Sparse cell pairs are
+       tested all at once; dense ones one by one, skipping pairs already in
+       the same set.
+    3. Non-core points join the cluster of a core point within eps, or are
+       noise (-1).
+
+Labels follow sklearn's conventions: clusters are numbered in order of their
+lowest-index core point, and a border point next to several clusters takes
+the lowest-numbered one (the first cluster sklearn's expansion reaches it
+from). Distances are compared as squared Euclidean distance <= eps².
+"""
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from itertools import product
+from typing import Dict, Tuple
+
+SMALL_PAIR = 256       # Cell pairs with at most this many core-core pairs are tested in bulk
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    """Union-find root with path halving"""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _cell_offsets(d: int) -> list:
+    """Cell offsets (excluding 0) whose nearest points can lie within eps"""
+    reach = int(np.ceil(np.sqrt(d)))
+    offsets = []
+    for offset in product(range(-reach, reach + 1), repeat=d):
+        gap = np.maximum(np.abs(offset) - 1, 0)
+        if any(offset) and np.sum(gap ** 2) <= d:
+            offsets.append(offset)
+    return offsets
+
+
+def _within(a: np.ndarray, b: np.ndarray, eps: float) -> bool:
+    """Whether any point of a is within eps of any point of b"""
+    if len(a) > len(b):
+        a, b = b, a
+    _, j = cKDTree(b).query(a, k=1)
+    return bool(np.any(np.sum((a - b[j]) ** 2, axis=1) <= eps * eps))
+
+
+def grid_dbscan(X: np.ndarray, eps: float, min_samples: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    DBSCAN with grid hashing and union-find cluster merging.
+
+    Args:
+        X: (N, d) points
+        eps: Neighbourhood radius (inclusive)
+        min_samples: Neighbours, including the point itself, for a core point
+
+    Returns:
+        (labels, is_core): cluster label per point (-1 = noise) and core mask
+    """
+    X = np.asarray(X, dtype=float)
+    n, d = X.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    # Slightly under eps/√d so rounding in the cell assignment cannot put two
+    # points more than eps apart in one cell
+    side = eps / np.sqrt(d) * (1 - 1e-9)
+
+    # Cells keyed by a linear index (with a margin of 2 so neighbour keys never wrap)
+    coords = np.floor((X - X.min(axis=0)) / side).astype(np.int64)
+    span = coords.max(axis=0) + 5
+    strides = np.concatenate([np.cumprod(span[::-1])[::-1][1:], [1]])
+    cell_keys, cell_of, cell_size = np.unique((coords + 2) @ strides, return_inverse=True,
+                                              return_counts=True)
+    n_cells = len(cell_keys)
+
+    # 1. Core points: dense cells are all core; count neighbours elsewhere
+    is_core = cell_size[cell_of] >= min_samples
+    tree = cKDTree(X)
+    sparse = np.nonzero(~is_core)[0]
+    if len(sparse):
+        counts = tree.query_ball_point(X[sparse], eps, return_length=True)
+        is_core[sparse] = counts >= min_samples
+
+    # Core points grouped by cell (CSR layout)
+    core_idx = np.nonzero(is_core)[0]
+    core_sorted = core_idx[np.argsort(cell_of[core_idx], kind='stable')]
+    n_core = np.bincount(cell_of[core_idx], minlength=n_cells)
+    core_start = np.concatenate([[0], np.cumsum(n_core)[:-1]])
+    core_cells = np.nonzero(n_core)[0]
+    keys = cell_keys[core_cells]
+
+    # 2. Candidate pairs of neighbouring core cells, each pair once
+    pair_a, pair_b = [], []
+    for offset in _cell_offsets(d):
+        if offset <= tuple([0] * d):
+            continue
+        target = keys + np.dot(offset, strides)
+        pos = np.minimum(np.searchsorted(keys, target), len(keys) - 1)
+        hit = keys[pos] == target
+        pair_a.append(core_cells[hit])
+        pair_b.append(core_cells[pos[hit]])
+    pair_a = np.concatenate(pair_a) if pair_a else np.zeros(0, dtype=np.int64)
+    pair_b = np.concatenate(pair_b) if pair_b else np.zeros(0, dtype=np.int64)
+
+    # Small pairs: test every core-core distance at once
+    size = n_core[pair_a] * n_core[pair_b]
+    small = size <= SMALL_PAIR
+    pa, pb, ps = pair_a[small], pair_b[small], size[small]
+    pair_of = np.repeat(np.arange(len(pa)), ps)
+    k = np.arange(len(pair_of)) - np.repeat(np.cumsum(ps) - ps, ps)
+    i = core_sorted[core_start[pa][pair_of] + k // n_core[pb][pair_of]]
+    j = core_sorted[core_start[pb][pair_of] + k % n_core[pb][pair_of]]
+    close = np.sum((X[i] - X[j]) ** 2, axis=1) <= eps * eps
+    linked = np.bincount(pair_of[close], minlength=len(pa)) > 0
+
+    # Union-find forest seeded with the small links (each component rooted at
+    # its lowest cell), then large pairs tested only where still separate
+    graph = coo_matrix((np.ones(np.sum(linked)), (pa[linked], pb[linked])), shape=(n_cells, n_cells))
+    _, component = connected_components(graph, directed=False)
+    root = np.full(component.max() + 1, n_cells)
+    np.minimum.at(root, component, np.arange(n_cells))
+    parent = root[component]
+    for a, b in zip(pair_a[~small].tolist(), pair_b[~small].tolist()):
+        root_a, root_b = _find(parent, a), _find(parent, b)
+        if root_a == root_b:
+            continue
+        members_a = core_sorted[core_start[a]:core_start[a] + n_core[a]]
+        members_b = core_sorted[core_start[b]:core_start[b] + n_core[b]]
+        if _within(X[members_a], X[members_b], eps):
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Number clusters by their lowest-index core point, as sklearn does
+    labels = np.full(n, -1, dtype=np.int64)
+    if len(core_idx) == 0:
+        return labels, is_core
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            break
+        parent = grandparent
+    roots = parent[cell_of[core_idx]]
+    unique_roots, first = np.unique(roots, return_index=True)
+    rank = np.empty(len(unique_roots), dtype=np.int64)
+    rank[np.argsort(core_idx[first])] = np.arange(len(unique_roots))
+    labels[core_idx] = rank[np.searchsorted(unique_roots, roots)]
+
+    # 3. Border points take the lowest cluster label among their core neighbours
+    non_core = np.nonzero(~is_core)[0]
+    if len(non_core):
+        neighbours = tree.query_ball_point(X[non_core], eps)
+        lengths = np.array([len(nb) for nb in neighbours])
+        flat = np.concatenate(neighbours).astype(np.int64)
+        flat_labels = np.where(is_core[flat], labels[flat], n)
+        best = np.minimum.reduceat(flat_labels, np.cumsum(lengths) - lengths)
+        labels[non_core] = np.where(best < n, best, -1)
+
+    return labels, is_core
+
+
+def summarize_clusters(labels: np.ndarray) -> Dict[str, object]:
+    """Number of clusters and their sizes (noise excluded)"""
+    sizes = np.bincount(labels[labels >= 0]) if np.any(labels >= 0) else np.zeros(0, dtype=np.int64)
+    return {'n_clusters': len(sizes), 'sizes': sizes, 'n_noise': int(np.sum(labels < 0))}
@@ -0,0 +1,201 @@
+"""
+Vectorised Harmonic Lattice Matching
+
+Array versions of the scalar checks in heartbeat_analysis.py (check_harmonics)
+and analysis/extract_k_from_catalog.py (calculate_k). Every function takes
+arrays of observations and a set of base constants, and scores all of them
+against all bases in a single broadcast, with no Python loops:
+
+    match_multiples   x ≈ m × base     (frequencies vs 312, 456 µHz series)
+    match_divisors    x ≈ base / m     (periods vs 456 days)
+    match_k           f_puls / f_orb = n ≈ base / k
+
+Every rel_error is |predicted - x| / x, relative to the observed value x, as
+in the scalar versions. match_divisors computes it as |base/x - m| / m (the
+form of the scalar period checks), which is the same quantity; in match_k it
+is therefore |k - k_int| / k_int, relative to the integer k. The best base
+per observation is the one with the smallest relative error; exact ties go
+to the later base, as check_harmonics sends 312/456 ties to 456.
+"""
+
+import numpy as np
+from typing import Dict, Sequence
+
+# DFA Constants
+BASE_HARMONIC = 312.0      # Geometric Base
+STELLAR_HEARTBEAT = 456.0  # 312 * D2
+DEFAULT_BASES = (BASE_HARMONIC, STELLAR_HEARTBEAT)
+
+MATCH_TOLERANCE = 0.02     # 2% relative error counts as a match
+
+
+def _best_of(values: np.ndarray, m: np.ndarray, predicted: np.ndarray,
+             rel_error: np.ndarray, bases: np.ndarray, tolerance: float) -> Dict[str, np.ndarray]:
+    """Pick the base with the smallest relative error (the last one on ties) for every observation"""
+    best = rel_error.shape[-1] - 1 - np.argmin(rel_error[..., ::-1], axis=-1)
+
+    def take(a):
+        return np.take_along_axis(a, best[..., None], axis=-1)[..., 0]
+
+    err = take(rel_error)
+    return {
+        'value': values,
+        'base': bases[best],
+        'base_index': best,
+        'harmonic': take(m),
+        'predicted': take(predicted),
+        'rel_error': err,
+        'match': err < tolerance,
+    }
+
+
+def match_multiples(values: Sequence[float], bases: Sequence[float] = DEFAULT_BASES,
+                    tolerance: float = MATCH_TOLERANCE) -> Dict[str, np.ndarray]:
+    """
+    Match observations to the nearest integer multiple of each base.
+
+    rel_error = |m × base - x| / x.
+
+    Args:
+        values: Observed values, any shape (e.g. frequencies in µHz)
+        bases: Base constants to test
+        tolerance: Relative error below which an observation matches
+
+    Returns:
+        dict of arrays with the shape of values: base, base_index, harmonic
+        (nearest m >= 1), predicted (m × base), rel_error, match
+    """
+    values = np.asarray(values, dtype=float)
+    bases = np.asarray(bases, dtype=float)
+
+    m = np.maximum(np.rint(values[..., None] / bases), 1)
+    predicted = m * bases
+    rel_error = np.abs(values[..., None] - predicted) / values[..., None]
+
+    return _best_of(values, m.astype(np.int64), predicted, rel_error, bases, tolerance)
+
+
+def match_divisors(values: Sequence[float], bases: Sequence[float] = DEFAULT_BASES,
+                   tolerance: float = MATCH_TOLERANCE) -> Dict[str, np.ndarray]:
+    """
+    Match observations to the nearest integer fraction base / m of each base.
+
+    rel_error = |base / x - m| / m, which equals |base / m - x| / x.
+
+    Args:
+        values: Observed values, any shape (e.g. periods in days)
+        bases: Base constants to test
+        tolerance: Relative error below which an observation matches
+
+    Returns:
+        dict of arrays with the shape of values: base, base_index, harmonic
+        (nearest m >= 1), predicted (base / m), rel_error, match
+    """
+    values = np.asarray(values, dtype=float)
+    bases = np.asarray(bases, dtype=float)
+
+    ratio = bases / values[..., None]
+    m = np.maximum(np.rint(ratio), 1)
+    predicted = bases / m
+    rel_error = np.abs(ratio - m) / m
+
+    return _best_of(values, m.astype(np.int64), predicted, rel_error, bases, tolerance)
+
+
+def match_k(f_puls: Sequence[float], f_orb: Sequence[float],
+            bases: Sequence[float] = (STELLAR_HEARTBEAT,),
+            tolerance: float = MATCH_TOLERANCE) -> Dict[str, np.ndarray]:
+    """
+    Vectorised calculate_k: n = f_puls / f_orb, k = base / n.
+
+    rel_error = |k - k_int| / k_int, relative to the integer k, which equals
+    |base / k_int - n| / n, relative to the observed n (match_divisors on n).
+
+    Args:
+        f_puls: Pulsation frequencies
+        f_orb: Orbital frequencies (same units, broadcastable to f_puls)
+        bases: Base constants (N₀ = 456 by default)
+        tolerance: Relative error below which a ratio matches
+
+    Returns:
+        dict of arrays: n (observed ratio), k (exact base / n), k_int (nearest
+        integer k >= 1 for the best base), base, base_index, rel_error, match
+    """
+    n = np.asarray(f_puls, dtype=float) / np.asarray(f_orb, dtype=float)
+    result = match_divisors(n, bases, tolerance)
+
+    return {
+        'n': n,
+        'k': result['base'] / n,
+        'k_int': result['harmonic'],
+        'base': result['base'],
+        'base_index': result['base_index'],
+        'rel_error': result['rel_error'],
+        'match': result['match'],
+    }
+
+
+def base_coherence_scan(ratios: Sequence[float], base_min: float = 300.0,
+                        base_max: float = 600.0, step: float = 0.01) -> Dict[str, np.ndarray]:
+    """
+    Lattice coherence of k = N₀ / ratio for a dense grid of trial bases N₀.
+
+    For each trial base the Rayleigh power of the phases 2π k,
+
+        Z(N₀) = |Σ_j exp(2πi N₀ / ratio_j)|² / N,
+
+    measures how strongly k clusters at integers. Z ≈ 1 for random phases and
+    P(Z > z) ≈ exp(-z) at a single, pre-chosen base. The sum is a
+    trigonometric sum over a regular frequency grid, so the whole curve is
+    evaluated at once with the extirpolation FFT from batch_periodogram.
+
+    Args:
+        ratios: Observed ratios n (e.g. ν_max / Δν)
+        base_min, base_max: Trial base range
+        step: Trial base spacing
+
+    Returns:
+        dict of arrays: bases, power
+    """
+    from batch_periodogram import trig_sum
+
+    x = 1.0 / np.asarray(ratios, dtype=float)
+    x = x[np.isfinite(x)]
+    n_bases = int(round((base_max - base_min) / step)) + 1
+
+    S, C = trig_sum(x, np.ones_like(x), base_min, step, n_bases)
+    return {
+        'bases': base_min + step * np.arange(n_bases),
+        'power': (S ** 2 + C ** 2) / len(x),
+    }
+
+
+def lattice_window_counts(k: Sequence[float], base: float = STELLAR_HEARTBEAT,
+                          n_max: int = 456, widths: Sequence[float] = (2.0,)) -> Dict[str, np.ndarray]:
+    """
+    Number of k values within ±width of every lattice point base / n.
+
+    k is sorted once and every (n, width) window is answered with two
+    searchsorted calls, so all lattice points and widths cost
+    O((N + M) log N) together instead of one pass over the data per window.
+    Windows are closed, [base/n - width, base/n + width], as in TEST 2.
+
+    Args:
+        k: Observed k values (non-finite values are ignored)
+        base: Lattice base N₀
+        n_max: Lattice points n = 1 … n_max
+        widths: Window half-widths
+
+    Returns:
+        dict of arrays: n (n_max,), k_pred (n_max,), widths (W,),
+        counts (W, n_max)
+    """
+    k = np.asarray(k, dtype=float)
+    k_sorted = np.sort(k[np.isfinite(k)])
+    n = np.arange(1, n_max + 1)
+    k_pred = base / n
+    widths = np.asarray(widths, dtype=float)
+
+    lo = np.searchsorted(k_sorted, k_pred[None, :] - widths[:, None], side='left')
+    hi = np.searchsorted(k_sorted, k_pred[None, :] + widths[:, None], side='right')
+    return {'n': n, 'k_pred': k_pred, 'widths': widths, 'counts': hi - lo}
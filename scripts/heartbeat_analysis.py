@@ -1,4 +1,5 @@
 import numpy as np
+from harmonic_lattice import match_multiples, match_divisors
 
 # DFA Constants
 D2 = 1.4615  # Packing Conflict Dimension (19/13)
@@ -14,31 +15,14 @@ def check_harmonics(observed_freq, system_name):
     print(f"\n--- Analyzing {system_name} ---")
     print(f"Observed Frequency: {observed_freq:.2f} µHz (or equivalent)")
 
-    # Check Base Harmonic (312)
-    n_base = observed_freq / BASE_HARMONIC
-    n_base_round = round(n_base)
-    if n_base_round == 0: n_base_round = 1
-    diff_base = abs(observed_freq - (n_base_round * BASE_HARMONIC))
-    error_base = (diff_base / observed_freq) * 100
-    
-    # Check Heartbeat Harmonic (456)
-    n_heart = observed_freq / STELLAR_HEARTBEAT
-    n_heart_round = round(n_heart)
-    if n_heart_round == 0: n_heart_round = 1
-    diff_heart = abs(observed_freq - (n_heart_round * STELLAR_HEARTBEAT))
-    error_heart = (diff_heart / observed_freq) * 100
+    # Check Base Harmonic (312) and Heartbeat Harmonic (456) together
+    match = match_multiples(observed_freq, (BASE_HARMONIC, STELLAR_HEARTBEAT))
 
     # Determine Best Fit
-    if error_base < error_heart:
-        best_fit = "BASE (312)"
-        harmonic = n_base_round
-        error = error_base
-        pred = n_base_round * BASE_HARMONIC
-    else:
-        best_fit = "HEARTBEAT (456)"
-        harmonic = n_heart_round
-        error = error_heart
-        pred = n_heart_round * STELLAR_HEARTBEAT
+    best_fit = "BASE (312)" if match['base_index'] == 0 else "HEARTBEAT (456)"
+    harmonic = int(match['harmonic'])
+    error = float(match['rel_error']) * 100
+    pred = float(match['predicted'])
 
     print(f"Best Fit: {best_fit}")
     print(f"Harmonic N: {harmonic}")
@@ -81,9 +65,9 @@ def process_csv(filepath):
                 # Check Period Harmonic: N * Period = 456
                 target = 456.0
                 ratio = target / val
-                n_round = round(ratio)
-                if n_round == 0: n_round = 1
-                error = abs(ratio - n_round) / n_round * 100
+                match = match_divisors(val, (target,))
+                n_round = int(match['harmonic'])
+                error = float(match['rel_error']) * 100
                 print(f"\nSystem: {system}")
                 print(f"Period: {val} days -> Target 456")
                 print(f"Harmonic: {n_round} (Ratio {ratio:.2f})")
@@ -106,6 +90,7 @@ if __name__ == "__main__":
             with open(filepath, 'r') as f:
                 lines = f.readlines()
             
+            kics, periods = [], []
             data_start = False
             for line in lines:
                 if line.startswith("---"):
@@ -140,19 +125,19 @@ if __name__ == "__main__":
                         continue
                 
                 if period > 0:
-                    # Check Period Harmonic: N * Period = 456
-                    target = 456.0
-                    ratio = target / period
-                    n_round = round(ratio)
-                    if n_round == 0: n_round = 1
-                    error = abs(ratio - n_round) / n_round * 100
-                    
-                    if error < 1.5: # Strict 1.5% threshold
-                        print(f"\nSystem: KIC {kic}")
-                        print(f"Period: {period} days -> Target 456")
-                        print(f"Harmonic: {n_round} (Ratio {ratio:.2f})")
-                        print(f"Error: {error:.2f}%")
-                        print("✅ VALIDATED")
+                    kics.append(kic)
+                    periods.append(period)
+
+            # Check Period Harmonic for all systems at once: N * Period = 456
+            target = 456.0
+            periods = np.array(periods)
+            match = match_divisors(periods, (target,), tolerance=0.015)  # Strict 1.5% threshold
+            for i in np.nonzero(match['match'])[0]:
+                print(f"\nSystem: KIC {kics[i]}")
+                print(f"Period: {periods[i]} days -> Target 456")
+                print(f"Harmonic: {match['harmonic'][i]} (Ratio {target / periods[i]:.2f})")
+                print(f"Error: {match['rel_error'][i] * 100:.2f}%")
+                print("✅ VALIDATED")
         else:
             process_csv(filepath)
     else:
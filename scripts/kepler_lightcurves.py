@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Kepler Light Curve Ingestion
+
+Reads the per-quarter long-cadence FITS files saved by download_koi54.py (or
+any MAST download of *_llc.fits files), and writes one stitched light curve
+per KIC as memory-mapped .npy arrays plus a small JSON index:
+
+    lightcurves/
+        index.json                  per-KIC quarter segments and gaps
+        kic005621294_time.npy       float64, BJD - 2454833 (days)
+        kic005621294_flux.npy       float32, relative flux (per-quarter median removed)
+        kic005621294_flux_err.npy   float32, relative flux error
+
+Each quarter is normalised independently (flux / median - 1) so quarter-to-
+quarter offsets in PDCSAP_FLUX do not leak into the periodogram. Cadences with
+non-zero SAP_QUALITY or non-finite flux are dropped.
+
+Periodogram and folding code opens a light curve with open_lightcurve(kic),
+which memory-maps the arrays instead of re-opening 17 FITS files.
+
+Both directories default to paper/validation/datasets/kepler/ (koi54_data/
+and lightcurves/), where download_koi54.py saves its files.
+
+Usage:
+    python kepler_lightcurves.py [download_dir] [store_dir]
+"""
+
+import numpy as np
+from astropy.io import fits
+from pathlib import Path
+import json
+import sys
+
+# Default locations, next to the Kepler catalogs (independent of the working directory)
+KEPLER_DATA_DIR = Path(__file__).resolve().parent.parent / 'paper' / 'validation' / 'datasets' / 'kepler'
+DOWNLOAD_DIR = str(KEPLER_DATA_DIR / 'koi54_data')
+STORE_DIR = str(KEPLER_DATA_DIR / 'lightcurves')
+INDEX_FILE = 'index.json'
+
+# A gap is any break longer than this many cadences
+KEPLER_LC_CADENCE = 0.0204335    # Long cadence (days, 29.4 min)
+GAP_FACTOR = 5
+
+
+def read_quarter(fits_path):
+    """
+    Read one Kepler light curve file.
+
+    Args:
+        fits_path: Path to a *_llc.fits file
+
+    Returns:
+        (kic, quarter, time, flux, flux_err) with flagged/non-finite cadences
+        removed and flux normalised to the quarter median
+    """
+    with fits.open(fits_path, memmap=True) as hdul:
+        header = hdul[0].header
+        kic = int(header['KEPLERID'])
+        quarter = int(header.get('QUARTER', -1))
+        data = hdul[1].data
+        time = np.asarray(data['TIME'], dtype=np.float64)
+        flux = np.asarray(data['PDCSAP_FLUX'], dtype=np.float64)
+        flux_err = np.asarray(data['PDCSAP_FLUX_ERR'], dtype=np.float64)
+        quality = np.asarray(data['SAP_QUALITY'])
+
+    good = (quality == 0) & np.isfinite(time) & np.isfinite(flux) & np.isfinite(flux_err)
+    time, flux, flux_err = time[good], flux[good], flux_err[good]
+
+    median = np.median(flux) if len(flux) else 1.0
+    return kic, quarter, time, flux / median - 1.0, flux_err / median
+
+
+def find_gaps(time, cadence=KEPLER_LC_CADENCE, factor=GAP_FACTOR):
+    """Return [(t_before, t_after), ...] for every break longer than factor × cadence"""
+    if len(time) < 2:
+        return []
+    dt = np.diff(time)
+    idx = np.nonzero(dt > factor * cadence)[0]
+    return [(float(time[i]), float(time[i + 1])) for i in idx]
+
+
+def array_paths(kic, store_dir=STORE_DIR):
+    """Paths of the time/flux/flux_err arrays for one KIC"""
+    stem = Path(store_dir) / f"kic{kic:09d}"
+    return {name: Path(f"{stem}_{name}.npy") for name in ('time', 'flux', 'flux_err')}
+
+
+def load_index(store_dir=STORE_DIR):
+    """Load the store index (empty dict if nothing has been ingested)"""
+    path = Path(store_dir) / INDEX_FILE
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def ingest_target(kic, quarters, store_dir=STORE_DIR):
+    """
+    Stitch the quarters of one target and write its memory-mapped arrays.
+
+    Args:
+        kic: KIC number
+        quarters: List of (quarter, time, flux, flux_err) tuples
+        store_dir: Output directory
+
+    Returns:
+        Index entry (dict) for this target
+    """
+    quarters = sorted(quarters, key=lambda q: q[1][0] if len(q[1]) else np.inf)
+    n_total = sum(len(q[1]) for q in quarters)
+
+    paths = array_paths(kic, store_dir)
+    time = np.lib.format.open_memmap(paths['time'], mode='w+', dtype=np.float64, shape=(n_total,))
+    flux = np.lib.format.open_memmap(paths['flux'], mode='w+', dtype=np.float32, shape=(n_total,))
+    flux_err = np.lib.format.open_memmap(paths['flux_err'], mode='w+', dtype=np.float32, shape=(n_total,))
+
+    segments = []
+    start = 0
+    for quarter, t, f, e in quarters:
+        stop = start + len(t)
+        time[start:stop] = t
+        flux[start:stop] = f
+        flux_err[start:stop] = e
+        if len(t):
+            segments.append({'quarter': quarter, 'start': start, 'stop': stop,
+                             't_start': float(t[0]), 't_end': float(t[-1])})
+        start = stop
+
+    gaps = find_gaps(time)
+    for arr in (time, flux, flux_err):
+        arr.flush()
+    del time, flux, flux_err
+
+    return {
+        'kic': kic,
+        'n_points': n_total,
+        'baseline_days': segments[-1]['t_end'] - segments[0]['t_start'] if segments else 0.0,
+        'segments': segments,
+        'gaps': gaps,
+    }
+
+
+def ingest_directory(download_dir=DOWNLOAD_DIR, store_dir=STORE_DIR):
+    """
+    Ingest every *_llc.fits file below download_dir.
+
+    Returns:
+        Updated index (dict keyed by KIC string)
+    """
+    Path(store_dir).mkdir(parents=True, exist_ok=True)
+
+    by_kic = {}
+    for fits_path in sorted(Path(download_dir).rglob('*_llc.fits')):
+        kic, quarter, t, f, e = read_quarter(fits_path)
+        by_kic.setdefault(kic, []).append((quarter, t, f, e))
+
+    index = load_index(store_dir)
+    for kic, quarters in sorted(by_kic.items()):
+        entry = ingest_target(kic, quarters, store_dir)
+        index[str(kic)] = entry
+        print(f"  KIC {kic}: {len(quarters)} quarters, {entry['n_points']:,} points, "
+              f"{len(entry['gaps'])} gaps")
+
+    with open(Path(store_dir) / INDEX_FILE, 'w') as f:
+        json.dump(index, f, indent=1)
+
+    return index
+
+
+def open_lightcurve(kic, store_dir=STORE_DIR):
+    """
+    Memory-map the stitched light curve of one KIC.
+
+    Args:
+        kic: KIC number
+        store_dir: Directory written by ingest_directory()
+
+    Returns:
+        (time, flux, flux_err) read-only memory-mapped arrays
+    """
+    paths = array_paths(int(kic), store_dir)
+    return tuple(np.load(paths[name], mmap_mode='r') for name in ('time', 'flux', 'flux_err'))
+
+
+def main():
+    download_dir = sys.argv[1] if len(sys.argv) > 1 else DOWNLOAD_DIR
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+
+    print("=" * 70)
+    print("Kepler Light Curve Ingestion")
+    print("=" * 70)
+    print(f"Reading FITS files from: {download_dir}")
+    print(f"Writing stitched arrays to: {store_dir}")
+    print()
+
+    index = ingest_directory(download_dir, store_dir)
+
+    print()
+    print(f"Store now holds {len(index)} targets")
+    print(f"Index: {Path(store_dir) / INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
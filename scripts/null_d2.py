@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Null-Catalog D₂ Distributions from Surrogate Catalogs
+
+A measured D₂ only means something against the D₂ of catalogs without the
+structure being tested. This script generates many surrogate catalogs from
+the 10-year events and returns the distribution of their D₂ values:
+
+    shuffle      every feature column permuted independently: the marginals
+                 are kept exactly, correlations between features are removed
+    acceptance   every column drawn from a fine histogram of the data
+                 (uniform within each bin): an isotropic sky with the sin(Dec)
+                 acceptance and the energy spectrum of the data
+    phase        amplitude-adjusted Fourier surrogates (Theiler et al. 1992)
+                 of the MJD-ordered columns: the marginals and the linear
+                 temporal correlations are kept, anything nonlinear is
+                 randomised. All columns share one set of random phases, so
+                 their linear cross-correlation is kept as well.
+
+Surrogates are never written to disk. The base catalog is placed once in
+shared memory; each worker process attaches to it, generates surrogates from
+a per-surrogate seed and reduces each to one D₂ through the pair counters
+(feature_embeddings.correlation_dimension). Only the D₂ values come back, and
+a given seed gives the same surrogate for any number of workers.
+
+Usage:
+    python null_d2.py [events_dir] [n_surrogates]
+"""
+
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Sequence
+import os
+import sys
+
+from feature_embeddings import BASELINE_SPEC, correlation_dimension, embed, feature_table
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SURROGATE_KINDS = ('shuffle', 'acceptance', 'phase')
+N_SURROGATES = 100           # Per kind
+SAMPLE_SIZE = 5000           # Events per catalog (real and surrogate)
+HISTOGRAM_BINS = 200         # Marginal histogram used by 'acceptance'
+N_WORKERS = os.cpu_count()
+SEED = 42
+
+# ============================================================================
+# SURROGATES
+# ============================================================================
+
+def shuffle_surrogate(base: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Each column permuted independently"""
+    return np.column_stack([rng.permutation(column) for column in base.T])
+
+
+def acceptance_surrogate(base: np.ndarray, rng: np.random.Generator,
+                         n_bins: int = HISTOGRAM_BINS) -> np.ndarray:
+    """Each column drawn independently from a histogram of its values"""
+    n = len(base)
+    columns = []
+    for column in base.T:
+        counts, edges = np.histogram(column, bins=n_bins)
+        bins = rng.choice(n_bins, size=n, p=counts / counts.sum())
+        columns.append(edges[bins] + rng.random(n) * np.diff(edges)[bins])
+    return np.column_stack(columns)
+
+
+def phase_surrogate(base: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Amplitude-adjusted Fourier surrogate of time-ordered columns.
+
+    Each column is rank-mapped to Gaussian values, its Fourier phases are
+    replaced by random ones (shared by all columns), and the original values
+    are put back in the rank order of the result.
+    """
+    n = len(base)
+    phases = np.exp(2j * np.pi * rng.random(n // 2 + 1))
+    phases[0] = 1
+    if n % 2 == 0:
+        phases[-1] = 1
+
+    gauss = np.sort(rng.standard_normal(n))
+    surrogate = np.empty_like(base)
+    for k, column in enumerate(base.T):
+        ranks = np.argsort(np.argsort(column, kind='stable'), kind='stable')
+        shuffled = np.fft.irfft(np.fft.rfft(gauss[ranks]) * phases, n)
+        surrogate[np.argsort(shuffled, kind='stable'), k] = np.sort(column)
+    return surrogate
+
+
+SURROGATES = {
+    'shuffle': shuffle_surrogate,
+    'acceptance': acceptance_surrogate,
+    'phase': phase_surrogate,
+}
+
+# ============================================================================
+# PARALLEL NULL DISTRIBUTION
+# ============================================================================
+
+# Base catalog attached once per worker process by _init_surrogate_worker
+_BASE = None
+_SHM = None
+
+
+def _init_surrogate_worker(name: str, shape: tuple, dtype: str):
+    global _BASE, _SHM
+    _SHM = shared_memory.SharedMemory(name=name)
+    _BASE = np.ndarray(shape, dtype=dtype, buffer=_SHM.buf)
+
+
+def _minmax(X: np.ndarray) -> np.ndarray:
+    """Scale every column to [0, 1], as prepare_features does"""
+    lo, hi = X.min(axis=0), X.max(axis=0)
+    return (X - lo) / (hi - lo)
+
+
+def _surrogate_d2_job(args):
+    kind, seed = args
+    rng = np.random.default_rng(seed)
+    d2, _ = correlation_dimension(_minmax(SURROGATES[kind](_BASE, rng)))
+    return d2
+
+
+def null_distribution(base: np.ndarray, kind: str, n_surrogates: int = N_SURROGATES,
+                      seed: int = SEED, n_workers: int = N_WORKERS) -> np.ndarray:
+    """
+    D₂ of n_surrogates surrogate catalogs of one kind.
+
+    Args:
+        base: (N, d) unscaled feature columns, rows in time order for 'phase'
+        kind: One of SURROGATE_KINDS
+        n_surrogates: Number of surrogate catalogs
+        seed: Surrogate i uses seed + i
+        n_workers: Worker processes (1 runs in-process)
+
+    Returns:
+        (n_surrogates,) D₂ values (NaN where no scaling region was found)
+    """
+    if kind not in SURROGATES:
+        raise ValueError(f"Unknown surrogate kind: {kind}")
+    global _BASE
+    base = np.ascontiguousarray(base, dtype=float)
+    jobs = [(kind, seed + i) for i in range(n_surrogates)]
+
+    if n_workers == 1:
+        _BASE = base
+        return np.array([_surrogate_d2_job(job) for job in jobs])
+
+    shm = shared_memory.SharedMemory(create=True, size=base.nbytes)
+    try:
+        np.ndarray(base.shape, dtype=base.dtype, buffer=shm.buf)[:] = base
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_surrogate_worker,
+                                 initargs=(shm.name, base.shape, base.dtype.str)) as pool:
+            d2 = list(pool.map(_surrogate_d2_job, jobs, chunksize=max(1, n_surrogates // (4 * n_workers))))
+    finally:
+        shm.close()
+        shm.unlink()
+    return np.array(d2)
+
+
+def base_catalog(df: pd.DataFrame, spec: Sequence = BASELINE_SPEC,
+                 sample_size: int = SAMPLE_SIZE, seed: int = SEED) -> np.ndarray:
+    """
+    Unscaled feature columns of a time-ordered event subsample.
+
+    Columns are the spec's features without their scaling (surrogates are
+    drawn in the physical units and scaled afterwards).
+    """
+    sample = df.sample(n=sample_size, random_state=seed) if len(df) > sample_size else df
+    sample = sample.sort_values('MJD')
+    raw_spec = [(entry[0], 'none') for entry in spec]
+    return embed(feature_table(sample, [raw_spec]), raw_spec)
+
+
+def null_test(base: np.ndarray, kinds: Sequence[str] = SURROGATE_KINDS,
+              n_surrogates: int = N_SURROGATES, seed: int = SEED,
+              n_workers: int = N_WORKERS) -> Dict[str, Dict]:
+    """
+    Measured D₂ of the base catalog against each surrogate null.
+
+    Returns:
+        kind -> dict with d2 (null values), mean, std, z, p (two-sided
+        fraction of null values at least as far from the null mean as the
+        measured value); the measured D₂ is under the key 'measured'
+    """
+    measured, _ = correlation_dimension(_minmax(base))
+    results = {'measured': measured}
+    for kind in kinds:
+        d2 = null_distribution(base, kind, n_surrogates, seed, n_workers)
+        d2 = d2[np.isfinite(d2)]
+        mean, std = d2.mean(), d2.std(ddof=1)
+        p = (np.sum(np.abs(d2 - mean) >= abs(measured - mean)) + 1) / (len(d2) + 1)
+        results[kind] = {'d2': d2, 'mean': mean, 'std': std, 'z': (measured - mean) / std, 'p': p}
+    return results
+
+
+def main():
+    from analyze_10yr_d2 import load_all_events
+
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else 'events'
+    n_surrogates = int(sys.argv[2]) if len(sys.argv) > 2 else N_SURROGATES
+
+    print("=" * 70)
+    print("D2 NULL DISTRIBUTIONS: Surrogate Catalogs")
+    print("=" * 70)
+    print()
+
+    df = load_all_events(events_dir)
+    base = base_catalog(df)
+    print(f"\nBase catalog: {len(base):,} events, features {[entry[0] for entry in BASELINE_SPEC]}")
+    print(f"Surrogates: {n_surrogates} per kind, {N_WORKERS} worker(s)")
+
+    results = null_test(base, SURROGATE_KINDS, n_surrogates)
+    measured = results['measured']
+
+    print()
+    print(f"Measured D2 = {measured:.3f}")
+    print()
+    print(f"  {'Null':12s} {'mean':>8s} {'std':>8s} {'z':>8s} {'p':>8s}")
+    rows = []
+    for kind in SURROGATE_KINDS:
+        r = results[kind]
+        print(f"  {kind:12s} {r['mean']:8.3f} {r['std']:8.3f} {r['z']:8.2f} {r['p']:8.4f}")
+        rows.extend({'kind': kind, 'd2': d2} for d2 in r['d2'])
+
+    pd.DataFrame(rows).to_csv('null_d2_distribution.csv', index=False)
+    print("\n✓ Saved: null_d2_distribution.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""
+Pair Counting Without Pair Matrices
+
+Shared pair-count backend for the correlation-dimension and angular-
+correlation scripts. The scripts histogram pairwise separations by building
+the full N×N distance matrix, which needs O(N²) memory (about 7 GB for 30k
+events). The functions here give the same counts from sorted data.
+
+One-dimensional separations (e.g. zenith angle differences):
+
+    pair_counts_below      pairs with x_j - x_i below each threshold, via
+                           searchsorted on the sorted values
+    separation_histogram   drop-in for np.histogram of |x_i - x_j| over a
+                           (lower, upper) separation range
+
+Counts are exact, not approximate: every comparison is made on the same
+floating-point difference x_j - x_i that the dense matrix holds. Because that
+difference is monotone in x_j for fixed x_i, searchsorted gives a candidate
+index per point and a short vectorised correction pass makes it exact.
+O(N log N) time and O(N) memory per threshold.
+
+Multi-dimensional separations:
+
+    tree_pair_counts       cumulative pair counts within each radius between
+                           two point sets, with dual-tree counting
+                           (cKDTree.count_neighbors) split across processes
+    tiled_pair_counts      exact pdist-style counts (d < r) from row tiles of
+                           cdist, O(N²) time but O(TILE_ROWS × N) memory
+    tiled_cross_counts     the same between two point sets (d < r)
+    tiled_point_counts     per-point neighbour counts (d < r) from the same
+                           tiles, for variance estimates
+    smoothed_pair_counts   expected tiled counts when every distance carries a
+                           Gaussian uncertainty
+
+The tree and tiled counters take optional per-point weights; a pair then
+contributes w_i w_j instead of 1, at the same cost as unweighted counting.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from scipy.special import ndtr
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence, Tuple
+import os
+
+N_WORKERS = os.cpu_count()
+CHUNK_SIZE = 50_000        # Query points per worker task
+TILE_ROWS = 1024           # Rows of the distance matrix held at once
+SMOOTH_KERNEL_WIDTH = 8.0   # Smoothing kernel evaluated within this many σ (Φ(-8) ≈ 6e-16)
+
+
+def _first_not_below(x: np.ndarray, threshold: float, inclusive: bool) -> np.ndarray:
+    """
+    For every i, the first j > i with x[j] - x[i] >= threshold (> if inclusive).
+
+    x must be sorted ascending.
+    """
+    n = len(x)
+    i = np.arange(n)
+
+    def below(j, rows):
+        d = x[j] - x[rows]
+        return d <= threshold if inclusive else d < threshold
+
+    j = np.searchsorted(x, x + threshold, side='right' if inclusive else 'left')
+    j = np.clip(j, i + 1, n)
+
+    # x + threshold is rounded, so the candidate can be off by a few distinct
+    # values; tied x share one difference, so each step skips a whole run
+    while True:
+        rows = np.nonzero(j < n)[0]
+        rows = rows[below(j[rows], rows)]
+        if len(rows) == 0:
+            break
+        j[rows] = np.searchsorted(x, x[j[rows]], side='right')
+    while True:
+        rows = np.nonzero(j - 1 > i)[0]
+        rows = rows[~below(j[rows] - 1, rows)]
+        if len(rows) == 0:
+            break
+        j[rows] = np.maximum(np.searchsorted(x, x[j[rows] - 1], side='left'), rows + 1)
+    return j
+
+
+def pair_counts_below(x: np.ndarray, thresholds: Sequence[float],
+                      inclusive: bool = False, presorted: bool = False) -> np.ndarray:
+    """
+    Number of unordered pairs i < j with |x_i - x_j| < t (<= t if inclusive).
+
+    Args:
+        x: 1-D values
+        thresholds: Separation thresholds
+        inclusive: Count separations equal to the threshold
+        presorted: x is already sorted ascending
+
+    Returns:
+        (len(thresholds),) int64 pair counts
+    """
+    x = np.asarray(x, dtype=float)
+    if not presorted:
+        x = np.sort(x)
+    i = np.arange(len(x))
+    return np.array([np.sum(_first_not_below(x, t, inclusive) - i - 1)
+                     for t in thresholds], dtype=np.int64)
+
+
+def separation_histogram(x: np.ndarray, bins: int = 20, lower: float = 0.0,
+                         upper: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram of pairwise separations |x_i - x_j| with lower < d < upper.
+
+    Identical to
+
+        d = np.abs(x[:, None] - x[None, :])
+        np.histogram(d[(d > lower) & (d < upper)], bins=bins)
+
+    (ordered pairs, so every pair is counted twice) without forming d. As in
+    np.histogram the range is the min and max selected separation, bins are
+    half-open and the last bin is closed.
+
+    Returns:
+        (counts, bin_edges); counts is empty if no pair is selected
+    """
+    x = np.sort(np.asarray(x, dtype=float))
+    i = np.arange(len(x))
+    n = len(x)
+
+    # Smallest separation > lower and largest < upper, per point then overall
+    j_lo = _first_not_below(x, lower, inclusive=True)
+    j_hi = _first_not_below(x, upper, inclusive=False) - 1
+    has_pair = (j_lo < n) & (j_lo <= j_hi)
+    if not np.any(has_pair):
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    rows = np.nonzero(has_pair)[0]
+    d_min = np.min(x[j_lo[rows]] - x[rows])
+    d_max = np.max(x[j_hi[rows]] - x[rows])
+
+    # Only the range matters for equal-width bins
+    edges = np.histogram_bin_edges(np.array([d_min, d_max]), bins=bins)
+
+    # Selected pairs below each interior edge (edges only leave [d_min, d_max]
+    # when all selected separations are equal and np.histogram pads the range)
+    inner = edges[1:-1]
+    n_lower = np.sum(j_lo - i - 1)
+    n_selected = np.sum(j_hi - j_lo + 1, where=has_pair)
+    below_edge = pair_counts_below(x, np.clip(inner, d_min, d_max), presorted=True) - n_lower
+    below_edge = np.where(inner <= d_min, 0, np.where(inner > d_max, n_selected, below_edge))
+    cumulative = np.concatenate([[0], below_edge, [n_selected]])
+
+    return 2 * np.diff(cumulative), edges
+
+
+# Tree (and its point weights) built once per worker process by _init_tree_worker
+_TREE = None
+_TREE_WEIGHTS = None
+
+
+def _init_tree_worker(points: np.ndarray, weights: np.ndarray = None):
+    global _TREE, _TREE_WEIGHTS
+    _TREE = cKDTree(points)
+    _TREE_WEIGHTS = weights
+
+
+def _tree_counts_job(args):
+    chunk, chunk_weights, radii = args
+    if chunk_weights is None:
+        return cKDTree(chunk).count_neighbors(_TREE, radii)
+    return cKDTree(chunk).count_neighbors(_TREE, radii, weights=(chunk_weights, _TREE_WEIGHTS))
+
+
+def tree_pair_counts(points: np.ndarray, others: np.ndarray, radii: Sequence[float],
+                     n_workers: int = N_WORKERS, chunk_size: int = CHUNK_SIZE,
+                     weights: np.ndarray = None, other_weights: np.ndarray = None) -> np.ndarray:
+    """
+    Number of (i, j) pairs, i from points and j from others, with |p_i - o_j| <= r.
+
+    The query points are split into chunks; each worker holds a tree of
+    others and dual-tree counts one chunk against it, so pairs are never
+    enumerated. Pass the same array twice for auto-correlation counts: pairs
+    are then ordered and include the N self-pairs at distance 0.
+
+    Args:
+        points: (N, d) query points
+        others: (M, d) reference points
+        radii: Increasing radii
+        n_workers: Worker processes (1 runs in-process)
+        chunk_size: Query points per task
+        weights: Optional (N,) weights of points; a pair then counts w_i w_j
+        other_weights: (M,) weights of others (defaults to weights when
+            others is points)
+
+    Returns:
+        (len(radii),) int64 cumulative pair counts, float64 if weighted
+    """
+    radii = np.asarray(radii, dtype=float)
+    weighted = weights is not None or other_weights is not None
+    if weighted:
+        if other_weights is None and others is points:
+            other_weights = weights
+        weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+        other_weights = np.ones(len(others)) if other_weights is None else np.asarray(other_weights, dtype=float)
+    jobs = [(points[start:start + chunk_size], weights[start:start + chunk_size] if weighted else None, radii)
+            for start in range(0, len(points), chunk_size)]
+
+    if n_workers == 1 or len(jobs) == 1:
+        _init_tree_worker(others, other_weights)
+        counts = [_tree_counts_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_tree_worker,
+                                 initargs=(others, other_weights)) as pool:
+            counts = list(pool.map(_tree_counts_job, jobs))
+
+    counts = np.sum(counts, axis=0)
+    return counts.astype(np.float64) if weighted else counts.astype(np.int64)
+
+
+def tiled_pair_counts(points: np.ndarray, radii: Sequence[float],
+                      tile_rows: int = TILE_ROWS, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Number of unordered pairs i < j with distance strictly below each radius.
+
+    Gives the same counts as np.sum(pdist(points) < r) for every r, computing
+    the distance matrix one block of rows at a time (upper triangle only) and
+    binning each block against the sorted radii with searchsorted.
+
+    Args:
+        points: (N, d) points
+        radii: Increasing radii
+        tile_rows: Rows per block
+        weights: Optional (N,) weights; a pair then counts w_i w_j
+
+    Returns:
+        (len(radii),) int64 cumulative pair counts, float64 if weighted
+    """
+    radii = np.asarray(radii, dtype=float)
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    counts = np.zeros(len(radii) + 1, dtype=np.int64 if weights is None else np.float64)
+    for start in range(0, n - 1, tile_rows):
+        stop = min(start + tile_rows, n)
+        d = cdist(points[start:stop], points[start:])
+        upper = np.triu(np.ones(d.shape, dtype=bool), k=1)
+        pair_weights = None
+        if weights is not None:
+            pair_weights = np.outer(weights[start:stop], weights[start:])[upper]
+        # Index of the first radius each distance is strictly below
+        counts += np.bincount(np.searchsorted(radii, d[upper], side='right'),
+                              weights=pair_weights, minlength=len(radii) + 1)
+    return np.cumsum(counts)[:-1]
+
+
+def tiled_cross_counts(points: np.ndarray, others: np.ndarray, radii: Sequence[float],
+                       tile_rows: int = TILE_ROWS) -> np.ndarray:
+    """
+    Number of (i, j) pairs, i from points and j from others, with distance
+    strictly below each radius, from row tiles of cdist.
+
+    Returns:
+        (len(radii),) int64 cumulative pair counts
+    """
+    radii = np.asarray(radii, dtype=float)
+    counts = np.zeros(len(radii) + 1, dtype=np.int64)
+    if len(points) == 0 or len(others) == 0:
+        return counts[:-1]
+    for start in range(0, len(points), tile_rows):
+        d = cdist(points[start:start + tile_rows], others)
+        counts += np.bincount(np.searchsorted(radii, d.ravel(), side='right'), minlength=len(radii) + 1)
+    return np.cumsum(counts)[:-1]
+
+
+def tiled_point_counts(points: np.ndarray, radii: Sequence[float],
+                       tile_rows: int = TILE_ROWS) -> np.ndarray:
+    """
+    Number of other points strictly within each radius of every point.
+
+    Each pair is binned once from the upper triangle of a tile and credited
+    to both of its points. Summing over points and halving gives
+    tiled_pair_counts.
+
+    Returns:
+        (N, len(radii)) int64 cumulative neighbour counts
+    """
+    radii = np.asarray(radii, dtype=float)
+    points = np.asarray(points, dtype=float)
+    n, n_bins = len(points), len(radii) + 1
+    counts = np.zeros(n * n_bins, dtype=np.int64)
+    for start in range(0, n - 1, tile_rows):
+        stop = min(start + tile_rows, n)
+        d = cdist(points[start:stop], points[start:])
+        rows, cols = np.nonzero(np.triu(np.ones(d.shape, dtype=bool), k=1))
+        bins = np.searchsorted(radii, d[rows, cols], side='right')
+        counts += np.bincount((rows + start) * n_bins + bins, minlength=n * n_bins)
+        counts += np.bincount((cols + start) * n_bins + bins, minlength=n * n_bins)
+    return np.cumsum(counts.reshape(n, n_bins), axis=1)[:, :-1]
+
+
+def smoothed_pair_counts(points: np.ndarray, sigma: np.ndarray, radii: Sequence[float],
+                         weights: np.ndarray = None, tile_rows: int = TILE_ROWS,
+                         kernel_width: float = SMOOTH_KERNEL_WIDTH) -> np.ndarray:
+    """
+    Expected number of unordered pairs closer than each radius when every
+    point is uncertain.
+
+    A pair at measured distance d with combined uncertainty
+    s = sqrt(σ_i² + σ_j²) contributes Φ((r - d) / s), the probability that
+    its true distance is below r for a Gaussian distance error, instead of
+    the step function of tiled_pair_counts. The kernel is evaluated on the
+    exact distance of every pair, tile by tile, but only at the radii within
+    kernel_width × s of d; at all other radii Φ is 0 or 1 to within
+    Φ(-kernel_width) and the pair is binned as in tiled_pair_counts. With
+    σ = 0 the counts equal tiled_pair_counts.
+
+    Args:
+        points: (N, d) points
+        sigma: (N,) positional uncertainty of each point, in the units of points
+        radii: Increasing radii
+        weights: Optional (N,) weights; a pair then counts w_i w_j
+        tile_rows: Rows per block
+        kernel_width: Half-width of the kernel evaluation band, in units of s
+
+    Returns:
+        (len(radii),) float64 expected cumulative pair counts
+    """
+    radii = np.asarray(radii, dtype=float)
+    points = np.asarray(points, dtype=float)
+    sigma2 = np.asarray(sigma, dtype=float) ** 2
+    n = len(points)
+
+    steps = np.zeros(len(radii) + 1)
+    kernel = np.zeros(len(radii))
+    for start in range(0, n - 1, tile_rows):
+        stop = min(start + tile_rows, n)
+        d = cdist(points[start:stop], points[start:])
+        upper = np.triu(np.ones(d.shape, dtype=bool), k=1)
+        d = d[upper]
+        s = np.sqrt(np.add.outer(sigma2[start:stop], sigma2[start:])[upper])
+        w = np.outer(weights[start:stop], weights[start:])[upper] if weights is not None else None
+
+        # Radii in (d - width·s, d + width·s] get the kernel, larger ones count the pair fully
+        lo = np.searchsorted(radii, d - kernel_width * s, side='right')
+        hi = np.searchsorted(radii, d + kernel_width * s, side='right')
+        steps += np.bincount(hi, weights=w, minlength=len(radii) + 1)
+
+        band = np.nonzero(hi > lo)[0]
+        n_band = hi[band] - lo[band]
+        pair = np.repeat(band, n_band)
+        offset = np.arange(len(pair)) - np.repeat(np.cumsum(n_band) - n_band, n_band)
+        k = lo[pair] + offset
+        p = ndtr((radii[k] - d[pair]) / s[pair])
+        kernel += np.bincount(k, weights=p if w is None else p * w[pair], minlength=len(radii))
+
+    return np.cumsum(steps)[:-1] + kernel
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Per-Season D₂ Time Series
+
+analyze_10yr_d2.py only computes D₂ on the pooled 10-year sample, although
+every event carries its season (IC40, IC59, IC79, IC86_I, ...). This script
+computes D₂ for every season and for rolling windows of consecutive seasons,
+to show whether D₂ drifts with the detector configuration.
+
+Events are read from the memory-mapped store written by event_store.py
+(created on the first run). Seasons are stored contiguously in time order,
+so every season and every rolling window is one row range; each worker
+process maps the store and reads only its own rows. D₂ is computed as in
+analyze_by_energy (an event subsample embedded as [log10 E, sin Dec], each
+scaled to [0, 1] over the subset) through the pair counters used by
+feature_embeddings.py.
+
+Usage:
+    python season_d2.py [events_dir] [store_dir]
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+import os
+import sys
+
+from event_store import EVENTS_DIR, INDEX_FILE, STORE_DIR, ingest_events, load_index, season_rows
+from feature_embeddings import BASELINE_SPEC, correlation_dimension, embed, feature_table
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SAMPLE_SIZE = 5000           # Events per season or window, as in analyze_by_energy
+ROLLING_WINDOW = 3           # Consecutive seasons per rolling window
+MIN_EVENTS = 1000
+N_WORKERS = os.cpu_count()
+SEED = 42
+
+# ============================================================================
+# SEGMENTS
+# ============================================================================
+
+def season_segments(index: Dict, window: int = ROLLING_WINDOW) -> List[Dict]:
+    """
+    Row ranges of every season and every rolling window of seasons.
+
+    Returns:
+        List of dicts with label, kind ('season' or 'rolling'), seasons,
+        start, stop, mjd_start, mjd_end
+    """
+    seasons = index['seasons']
+    segments = [{'label': s['season'], 'kind': 'season', 'seasons': s['season'],
+                 'start': s['start'], 'stop': s['stop'],
+                 'mjd_start': s['mjd_start'], 'mjd_end': s['mjd_end']} for s in seasons]
+    if window > 1:
+        for first in range(len(seasons) - window + 1):
+            group = seasons[first:first + window]
+            segments.append({'label': f"{group[0]['season']}..{group[-1]['season']}", 'kind': 'rolling',
+                             'seasons': '+'.join(s['season'] for s in group),
+                             'start': group[0]['start'], 'stop': group[-1]['stop'],
+                             'mjd_start': group[0]['mjd_start'], 'mjd_end': group[-1]['mjd_end']})
+    return segments
+
+
+def _segment_d2_job(args):
+    store_dir, start, stop, sample_size, seed = args
+    df = season_rows(store_dir, start, stop)
+    if len(df) < MIN_EVENTS:
+        return np.nan, np.nan, len(df)
+    if len(df) > sample_size:
+        df = df.sample(n=sample_size, random_state=seed)
+    d2, err = correlation_dimension(embed(feature_table(df, [BASELINE_SPEC]), BASELINE_SPEC))
+    return d2, err, stop - start
+
+
+def season_d2_table(store_dir: str = STORE_DIR, window: int = ROLLING_WINDOW,
+                    sample_size: int = SAMPLE_SIZE, seed: int = SEED,
+                    n_workers: int = N_WORKERS) -> pd.DataFrame:
+    """
+    D₂ of every season and rolling window, segments run concurrently.
+
+    Returns:
+        DataFrame with columns: label, kind, seasons, mjd_start, mjd_end, N,
+        D2, error
+    """
+    segments = season_segments(load_index(store_dir), window)
+    jobs = [(store_dir, s['start'], s['stop'], sample_size, seed) for s in segments]
+
+    if n_workers == 1 or len(jobs) == 1:
+        results = [_segment_d2_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_segment_d2_job, jobs))
+
+    rows = []
+    for segment, (d2, err, n) in zip(segments, results):
+        rows.append({'label': segment['label'], 'kind': segment['kind'], 'seasons': segment['seasons'],
+                     'mjd_start': segment['mjd_start'], 'mjd_end': segment['mjd_end'],
+                     'N': n, 'D2': d2, 'error': err})
+    return pd.DataFrame(rows)
+
+
+def main():
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else EVENTS_DIR
+    store_dir = sys.argv[2] if len(sys.argv) > 2 else STORE_DIR
+
+    print("=" * 70)
+    print("PER-SEASON D2: IceCube 10-Year Point Source Data")
+    print("=" * 70)
+    print()
+
+    if not (Path(store_dir) / INDEX_FILE).exists():
+        print(f"No event store in {store_dir}; ingesting {events_dir}")
+        ingest_events(events_dir, store_dir)
+        print()
+
+    table = season_d2_table(store_dir)
+
+    for kind, title in (('season', 'Per season'), ('rolling', f'Rolling {ROLLING_WINDOW}-season windows')):
+        print(f"{title}:")
+        for _, row in table[table['kind'] == kind].iterrows():
+            print(f"  {row['label']:24s} MJD {row['mjd_start']:8.1f}-{row['mjd_end']:8.1f}  "
+                  f"D2 = {row['D2']:.3f} +/- {row['error']:.3f} (N={row['N']:,})")
+        print()
+
+    seasons = table[(table['kind'] == 'season') & np.isfinite(table['D2'])]
+    if len(seasons) > 1:
+        weights = 1 / seasons['error'] ** 2
+        mean = np.sum(weights * seasons['D2']) / np.sum(weights)
+        chi2 = np.sum(weights * (seasons['D2'] - mean) ** 2)
+        print(f"Weighted mean over seasons: D2 = {mean:.3f}")
+        print(f"Season-to-season scatter: chi2 = {chi2:.1f} for {len(seasons) - 1} dof")
+
+    table.to_csv('season_d2.csv', index=False)
+    print("\n✓ Saved: season_d2.csv")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,8 @@ from scipy.spatial.distance import pdist, cdist
 import warnings
 warnings.filterwarnings('ignore')
 
+from loglog_fit import correlation_slopes
+
 print("=" * 70)
 print("D₂ VERIFICATION FROM HESE 7.5-YEAR DATA")
 print("=" * 70)
@@ -45,8 +47,8 @@ features = np.column_stack([log_e_norm, cos_z_norm])
 print(f"Feature space: [log10(E), cos(zenith)] normalized to [0,1]")
 print()
 
-def grassberger_procaccia(X, n_radii=30):
-    """Calculate D₂ using Grassberger-Procaccia algorithm."""
+def correlation_curve(X, n_radii=30):
+    """Correlation integral C(r) over the 5th-95th percentile pair distances."""
     N = len(X)
     distances = pdist(X, metric='euclidean')
 
@@ -58,33 +60,31 @@ def grassberger_procaccia(X, n_radii=30):
     for r in r_values:
         count = np.sum(distances < r)
         C_r.append(2.0 * count / (N * (N - 1)))
-    C_r = np.array(C_r)
-
-    # Scaling region
-    valid = (C_r > 0.01) & (C_r < 0.99)
-    if np.sum(valid) < 5:
-        return np.nan, np.nan
+    return r_values, np.array(C_r)
 
-    log_r = np.log(r_values[valid])
-    log_C = np.log(C_r[valid])
+def grassberger_procaccia(X, n_radii=30):
+    """Calculate D₂ using Grassberger-Procaccia algorithm."""
+    r_values, C_r = correlation_curve(X, n_radii)
 
-    coeffs, cov = np.polyfit(log_r, log_C, 1, cov=True)
-    D2 = coeffs[0]
-    error = np.sqrt(cov[0, 0])
+    # Scaling region 0.01 < C < 0.99 (NaN with fewer than 5 radii in it)
+    D2, error = correlation_slopes(r_values, C_r)
 
-    return D2, error, r_values, C_r
+    return D2[0], error[0], r_values, C_r
 
 def bootstrap_d2(X, n_bootstrap=1000):
     """Bootstrap estimation of D₂ uncertainty."""
-    d2_samples = []
+    radii, curves = [], []
     N = len(X)
 
     for i in range(n_bootstrap):
         indices = np.random.choice(N, size=N, replace=True)
-        sample = X[indices]
-        d2, _, _, _ = grassberger_procaccia(sample)
-        if not np.isnan(d2):
-            d2_samples.append(d2)
+        r_values, C_r = correlation_curve(X[indices])
+        radii.append(r_values)
+        curves.append(C_r)
+
+    # All replicates fitted in one batch
+    d2_samples, _ = correlation_slopes(np.array(radii), np.array(curves))
+    d2_samples = d2_samples[~np.isnan(d2_samples)]
 
     return np.mean(d2_samples), np.std(d2_samples), d2_samples
 
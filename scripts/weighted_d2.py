@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Uncertainty-Aware D₂ of the IceCube 10-Year Events
+
+grassberger_procaccia treats every event position as exact, although each
+10-year event has an angular reconstruction error AngErr (degrees). This
+script computes D₂ of the baseline [log10 E, sin Dec] embedding three ways:
+
+    exact       the unweighted correlation sum, as in analyze_10yr_d2.py
+    weighted    each pair counts w_i w_j with inverse-variance event weights
+                w ∝ 1 / AngErr², so poorly reconstructed events contribute less
+    smoothed    each pair contributes the probability that its true distance
+                is below r, given the combined uncertainty of its two events
+
+For the smoothed mode AngErr is propagated into the embedding: an angular
+error σ in declination moves sin Dec by cos(Dec) σ, which is then scaled by
+the same factor as the sin Dec feature. The energy axis has no per-event
+error in the data release and is taken as exact.
+
+Weights and smoothing are handled inside the pair counters (pair_counts.py):
+weighting costs about as much as the unweighted count, and smoothing, which
+evaluates the kernel on every pair distance near a radius, a few times more.
+
+Usage:
+    python weighted_d2.py [events_dir] [sample_size]
+"""
+
+import numpy as np
+import pandas as pd
+import sys
+
+from feature_embeddings import BASELINE_SPEC, SEED, correlation_dimension, embed, feature_table
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SAMPLE_SIZE = 10000
+ANG_ERR_FLOOR = 0.2        # Degrees; caps the weight of the best-reconstructed events
+
+# ============================================================================
+# EVENT UNCERTAINTIES
+# ============================================================================
+
+def event_weights(ang_err: np.ndarray, floor: float = ANG_ERR_FLOOR) -> np.ndarray:
+    """Inverse-variance weights 1 / AngErr², normalised to a mean of 1"""
+    weights = 1.0 / np.maximum(ang_err, floor) ** 2
+    return weights / weights.mean()
+
+
+def embedding_sigma(dec: np.ndarray, ang_err: np.ndarray, sin_dec_range: float) -> np.ndarray:
+    """Per-event uncertainty in the [0, 1]-scaled sin Dec coordinate"""
+    return np.cos(np.radians(dec)) * np.radians(ang_err) / sin_dec_range
+
+
+def uncertainty_d2(df: pd.DataFrame, sample_size: int = SAMPLE_SIZE, seed: int = SEED) -> pd.DataFrame:
+    """
+    D₂ of one event subsample with exact, weighted and smoothed counting.
+
+    Returns:
+        DataFrame with columns: mode, D2, error, N
+    """
+    sample = df.sample(n=sample_size, random_state=seed) if len(df) > sample_size else df
+    table = feature_table(sample, [BASELINE_SPEC])
+    X = embed(table, BASELINE_SPEC)
+
+    ang_err = sample['AngErr'].values
+    sin_dec = table['sin_dec']
+    sigma = embedding_sigma(sample['Dec'].values, ang_err, sin_dec['max'] - sin_dec['min'])
+
+    modes = {
+        'exact': {},
+        'weighted': {'weights': event_weights(ang_err)},
+        'smoothed': {'sigma': sigma},
+    }
+    rows = []
+    for mode, kwargs in modes.items():
+        d2, err = correlation_dimension(X, **kwargs)
+        rows.append({'mode': mode, 'D2': d2, 'error': err, 'N': len(X)})
+        print(f"  {mode:10s} D2 = {d2:.3f} +/- {err:.3f}")
+    return pd.DataFrame(rows)
+
+
+def main():
+    from analyze_10yr_d2 import load_all_events
+
+    events_dir = sys.argv[1] if len(sys.argv) > 1 else 'events'
+    sample_size = int(sys.argv[2]) if len(sys.argv) > 2 else SAMPLE_SIZE
+
+    print("=" * 70)
+    print("UNCERTAINTY-AWARE D2: AngErr Weighting and Kernel Smoothing")
+    print("=" * 70)
+    print()
+
+    df = load_all_events(events_dir)
+    ang_err = df['AngErr'].values
+    print(f"\nAngErr: median {np.median(ang_err):.2f}°, 90% below {np.percentile(ang_err, 90):.2f}°")
+    print(f"Sample: {min(sample_size, len(df)):,} events")
+    print()
+
+    results = uncertainty_d2(df, sample_size)
+
+    results.to_csv('weighted_d2.csv', index=False)
+    print("\n✓ Saved: weighted_d2.csv")
+
+
+if __name__ == '__main__':
+    main()